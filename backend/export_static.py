@@ -0,0 +1,379 @@
+"""Export CMS content into the zero-backend site in static-site/.
+
+Writes config.json, a pre-rendered home page per language (pt/, en/, es/)
+and the published blog under blog/. A manifest records what each page was
+built from, so later runs only re-render pages whose documents changed and
+only rewrite files whose bytes changed.
+
+Usage: python export_static.py [--out DIR] [--force] [--dry-run]
+"""
+import argparse
+import asyncio
+import hashlib
+import html
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from server import (
+    BLOG_SUMMARY_PROJECTION, LANGUAGES, PAGE_SORT, BlogPost, BlogPostSummary,
+    client, db, load_areas, load_settings, project_area
+)
+
+# Bump when the page templates below change to re-render every page
+EXPORT_VERSION = 1
+DEFAULT_OUT = Path(__file__).parent.parent / "static-site"
+MANIFEST = ".export-manifest.json"
+# config.json keys owned by the export; any others (e.g. "admin") are kept
+CONFIG_KEYS = ("site", "hero", "differentials", "about", "areas", "stats", "contact")
+
+
+def digest(*parts) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else json.dumps(part, sort_keys=True, default=str).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def esc(value) -> str:
+    return html.escape(str(value or ""))
+
+
+def translations_of(script: str) -> dict:
+    """Static UI strings from translations.js, per language"""
+    blocks = re.split(r"^\s*(\w\w): \{\s*$", script, flags=re.M)
+    return {
+        lang: {key: json.loads(value) for key, value in re.findall(r'"([^"]+)":\s*("(?:[^"\\]|\\.)*")', body)}
+        for lang, body in zip(blocks[1::2], blocks[2::2])
+    }
+
+
+def icon_name(icon: str) -> str:
+    """The CMS stores lucide-react names like ShieldCheck; the static site uses shield-check"""
+    return re.sub(r"(?<=[a-z])(?=[A-Z0-9])|(?<=[0-9])(?=[A-Z])", "-", icon or "").lower()
+
+
+def build_config(settings, areas, existing: dict) -> dict:
+    site = settings.model_dump(mode="json")
+    config = {
+        "site": {
+            "name": existing.get("site", {}).get("name", "Star Trade"),
+            "logo": site["logo_url"],
+            "language": site["default_language"],
+        },
+        "hero": {key: site["hero"][key] for key in ("video_url", "title", "subtitle", "cta_text")},
+        "differentials": [
+            {"icon": icon_name(d["icon"]), "title": d["title"], "description": d["description"]}
+            for d in sorted(site["differentials"], key=lambda d: d["order"])
+        ],
+        "about": {
+            "title": site["about"]["title"],
+            "paragraph1": site["about"]["paragraph1"],
+            "paragraph2": site["about"]["paragraph2"],
+            "image": site["about"]["image_url"],
+        },
+        "areas": [],
+        "stats": [{"value": s["value"], "label": s["label"]} for s in sorted(site["stats"], key=lambda s: s["order"])],
+        "contact": site["contact"],
+    }
+    for area in sorted((a for a in areas if a.is_active), key=lambda a: a.order):
+        data = area.model_dump(mode="json")
+        projected = {lang: project_area(data, lang, "pt") for lang in LANGUAGES}
+        config["areas"].append({
+            "title": {lang: projected[lang]["title"] for lang in LANGUAGES},
+            "description": {lang: projected[lang]["description"] for lang in LANGUAGES},
+            "image": data["image_url"],
+            "icon": icon_name(data["icon"]),
+            "is_specialty": data["is_specialty"],
+        })
+    config.update({key: value for key, value in existing.items() if key not in CONFIG_KEYS})
+    return config
+
+
+# ---- Home page: index.html with the script.js placeholders filled in ----
+
+def opening_tag(page: str, element_id: str) -> re.Match:
+    return re.search(r'<(?P<tag>\w+)(?P<attrs>[^>]*\bid="%s"[^>]*)>' % re.escape(element_id), page)
+
+
+def set_inner(page: str, element_id: str, inner: str) -> str:
+    match = opening_tag(page, element_id)
+    close = page.index(f"</{match['tag']}>", match.end())
+    return page[:match.end()] + inner + page[close:]
+
+
+def set_attr(page: str, element_id: str, attr: str, value: str) -> str:
+    match = opening_tag(page, element_id)
+    tag = re.sub(r'\b%s="[^"]*"' % attr, f'{attr}="{esc(value)}"', match[0])
+    return page[:match.start()] + tag + page[match.end():]
+
+
+def rebase(page: str, prefix: str) -> str:
+    """Point relative asset URLs at the site root from a page prefix levels down"""
+    return re.sub(r'(\s(?:href|src)=")(?![a-z]+:|/|#)([^"]+")', rf"\g<1>{prefix}\g<2>", page)
+
+
+def render_home(template: str, config: dict, strings: dict, lang: str) -> str:
+    def text(field) -> str:
+        if isinstance(field, dict):
+            return field.get(lang) or field.get("pt", "")
+        return field or ""
+
+    contact = config["contact"]
+    page = rebase(template, "../")
+    page = re.sub(
+        r"<html[^>]*>",
+        f'<html lang="{lang}" data-lang="{lang}" data-site-root="../">',
+        page, count=1
+    )
+    alternates = "".join(
+        f'\n    <link rel="alternate" hreflang="{code}" href="../{code}/">' for code in LANGUAGES
+    )
+    page = page.replace("</head>", f"{alternates}\n</head>", 1)
+    page = re.sub(
+        r'(<(\w+)[^>]*\bdata-i18n="([^"]+)"[^>]*>)[^<]*(</\2>)',
+        lambda m: m[1] + esc(strings.get(m[3], "")) + m[4] if m[3] in strings else m[0],
+        page
+    )
+
+    for element_id in ("logo-img", "footer-logo"):
+        page = set_attr(page, element_id, "src", config["site"]["logo"])
+    page = set_inner(page, "hero-video", f'\n            <source src="{esc(config["hero"]["video_url"])}" type="video/mp4">\n        ')
+    page = set_inner(page, "hero-title", esc(text(config["hero"]["title"])))
+    page = set_inner(page, "hero-subtitle", esc(text(config["hero"]["subtitle"])))
+    page = set_inner(page, "hero-cta", esc(text(config["hero"]["cta_text"])))
+    page = set_inner(page, "about-title", esc(text(config["about"]["title"])))
+    page = set_inner(page, "about-p1", esc(text(config["about"]["paragraph1"])))
+    page = set_inner(page, "about-p2", esc(text(config["about"]["paragraph2"])))
+    page = set_attr(page, "about-img", "src", config["about"]["image"])
+
+    # Same markup script.js builds, so the page doesn't shift when it runs
+    page = set_inner(page, "differentials-grid", "".join(f"""
+                <div class="differential-card">
+                    <div class="differential-icon"><i data-lucide="{esc(d['icon'] or 'star')}"></i></div>
+                    <h3>{esc(text(d['title']))}</h3>
+                    <p>{esc(text(d['description']))}</p>
+                </div>""" for d in config["differentials"]))
+    page = set_inner(page, "areas-grid", "".join(f"""
+                <div class="area-card">
+                    <img src="{esc(a['image'])}" alt="{esc(text(a['title']))}">
+                    <div class="area-card-overlay"></div>
+                    <div class="area-card-content">
+                        <span class="area-badge {'specialty' if a['is_specialty'] else ''}">{esc(strings.get('areas.specialty' if a['is_specialty'] else 'areas.sector', ''))}</span>
+                        <h3>{esc(text(a['title']))}</h3>
+                        <p>{esc(text(a['description']))}</p>
+                    </div>
+                </div>""" for a in config["areas"]))
+    page = set_inner(page, "stats-grid", "".join(f"""
+                <div class="stat-item">
+                    <div class="stat-value">{esc(s['value'])}</div>
+                    <div class="stat-label">{esc(text(s['label']))}</div>
+                </div>""" for s in config["stats"]))
+
+    page = set_inner(page, "contact-address", esc(contact.get("address")))
+    page = set_inner(page, "contact-phone", esc(contact.get("phone")))
+    page = set_inner(page, "contact-email", esc(contact.get("email")))
+    for network in ("linkedin", "instagram", "facebook"):
+        for element_id in (f"social-{network}", f"footer-{network}"):
+            page = set_attr(page, element_id, "href", contact.get(network, ""))
+    whatsapp = re.sub(r"\D", "", contact.get("whatsapp", ""))
+    return set_attr(page, "whatsapp-btn", "href", f"https://wa.me/{whatsapp}")
+
+
+# ---- Blog ----
+
+BLOG_PAGE = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title} - Star Trade</title>
+    <meta name="description" content="{description}">
+    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&family=Oswald:wght@400;500;600;700&display=swap" rel="stylesheet">
+    <link rel="stylesheet" href="{root}styles.css">
+    <style>
+        .blog-header {{ background: #0F172A; padding: 1rem 0; }}
+        .blog-header img {{ height: 40px; filter: brightness(0) invert(1); }}
+        .blog-main {{ max-width: 56rem; margin: 0 auto; padding: 3rem 1.5rem; }}
+        .blog-main h1 {{ font-family: 'Oswald', sans-serif; text-transform: uppercase; margin-bottom: 1rem; }}
+        .blog-meta {{ color: #64748B; font-size: 0.875rem; margin-bottom: 2rem; }}
+        .blog-cover {{ width: 100%; max-height: 400px; object-fit: cover; margin-bottom: 2rem; }}
+        .blog-body p, .blog-body ul, .blog-body ol, .blog-body pre {{ margin-bottom: 1rem; line-height: 1.75; }}
+        .blog-body h2, .blog-body h3 {{ font-family: 'Oswald', sans-serif; margin: 2rem 0 1rem; }}
+        .toc-h3 {{ margin-left: 1.5rem; }}
+        .blog-list {{ list-style: none; padding: 0; }}
+        .blog-list li {{ padding: 1.5rem 0; border-bottom: 1px solid #E2E8F0; }}
+        .blog-list a {{ color: #1E3A8A; font-weight: 600; }}
+    </style>
+</head>
+<body>
+    <header class="blog-header">
+        <div class="container">
+            <a href="{root}{lang}/"><img src="{logo}" alt="Star Trade"></a>
+        </div>
+    </header>
+    <main class="blog-main">
+{body}
+    </main>
+</body>
+</html>
+"""
+
+
+def published_on(post) -> str:
+    return post.created_at.strftime("%d/%m/%Y")
+
+
+def render_post(post: BlogPost, logo: str, lang: str) -> str:
+    toc = "".join(
+        f'<li class="toc-h{entry.level}"><a href="#{esc(entry.anchor)}">{esc(entry.text)}</a></li>'
+        for entry in post.toc
+    )
+    body = f"""        <p><a href="../">&larr; Blog</a></p>
+        <h1>{esc(post.title)}</h1>
+        <p class="blog-meta">{published_on(post)} &middot; {esc(post.author_name)}{f" &middot; {post.reading_time} min de leitura" if post.reading_time else ""}</p>
+        {f'<img class="blog-cover" src="{esc(post.cover_image)}" alt="{esc(post.title)}">' if post.cover_image else ""}
+        {f'<nav><ul>{toc}</ul></nav>' if len(post.toc) > 1 else ""}
+        <div class="blog-body">
+{post.content_html}
+        </div>"""
+    return BLOG_PAGE.format(
+        title=esc(post.meta_title or post.title), description=esc(post.meta_description or post.excerpt),
+        root="../../", lang=lang, logo=esc(logo), body=body
+    )
+
+
+def render_blog_index(posts, logo: str, lang: str) -> str:
+    items = "".join(f"""
+            <li>
+                <a href="{esc(p.slug)}/">{esc(p.title)}</a>
+                <p class="blog-meta">{published_on(p)}</p>
+                <p>{esc(p.excerpt)}</p>
+            </li>""" for p in posts)
+    body = f"""        <h1>Blog &amp; Notícias</h1>
+        <ul class="blog-list">{items}
+        </ul>"""
+    return BLOG_PAGE.format(
+        title="Blog", description="Blog & Notícias", root="../", lang=lang, logo=esc(logo), body=body
+    )
+
+
+# ---- Incremental writer ----
+
+class StaticExport:
+    """Writes pages into out, skipping any whose source digest is unchanged"""
+
+    def __init__(self, out: Path, force: bool, dry_run: bool):
+        self.out = out
+        self.dry_run = dry_run
+        manifest = out / MANIFEST
+        self.previous = {} if force or not manifest.exists() else json.loads(manifest.read_text())
+        self.pages = {}
+        self.written = []
+        self.unchanged = 0
+
+    def is_current(self, path: str, source: str) -> bool:
+        entry = self.previous.get(path)
+        if entry and entry["source"] == source and (self.out / path).exists():
+            self.pages[path] = entry
+            self.unchanged += 1
+            return True
+        return False
+
+    def emit(self, path: str, source: str, content: str):
+        data = content.encode()
+        output = hashlib.sha256(data).hexdigest()
+        self.pages[path] = {"source": source, "output": output}
+        target = self.out / path
+        if target.exists() and hashlib.sha256(target.read_bytes()).hexdigest() == output:
+            self.unchanged += 1
+            return
+        self.written.append(path)
+        if not self.dry_run:
+            write_atomic(target, data)
+
+    def finish(self) -> list:
+        """Delete pages that are no longer exported and save the manifest"""
+        removed = sorted(self.previous.keys() - self.pages.keys())
+        if not self.dry_run:
+            for path in removed:
+                (self.out / path).unlink(missing_ok=True)
+            write_atomic(self.out / MANIFEST, json.dumps(self.pages, indent=2, sort_keys=True).encode())
+        return removed
+
+
+def write_atomic(target: Path, data: bytes):
+    # A CDN sync running alongside never sees a half-written file
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=".export-")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, target)
+
+
+async def export(out: Path, force: bool, dry_run: bool) -> StaticExport:
+    run = StaticExport(out, force, dry_run)
+    settings, areas = await asyncio.gather(load_settings(), load_areas())
+    config_path = out / "config.json"
+    existing = json.loads(config_path.read_text()) if config_path.exists() else {}
+
+    config = build_config(settings, areas, existing)
+    run.emit("config.json", digest(config), json.dumps(config, indent=2, ensure_ascii=False) + "\n")
+
+    template = (out / "index.html").read_text()
+    translations_js = (out / "translations.js").read_text()
+    strings = translations_of(translations_js)
+    for lang in LANGUAGES:
+        path = f"{lang}/index.html"
+        source = digest(EXPORT_VERSION, template, translations_js, config, lang)
+        if not run.is_current(path, source):
+            run.emit(path, source, render_home(template, config, strings.get(lang, {}), lang))
+
+    # Summaries first; full posts are only fetched for pages that need rebuilding
+    logo, lang = config["site"]["logo"], config["site"]["language"]
+    summaries = await db.blog_posts.find(
+        {"is_published": True}, {**BLOG_SUMMARY_PROJECTION, "render_version": 1}
+    ).sort(PAGE_SORT).to_list(None)
+    stale = {}
+    summaries = [doc for doc in summaries if re.fullmatch(r"[\w-]+", doc.get("slug", ""))]
+    for doc in summaries:
+        path = f"blog/{doc['slug']}/index.html"
+        source = digest(EXPORT_VERSION, doc["updated_at"], doc.get("render_version"), logo, lang)
+        if not run.is_current(path, source):
+            stale[doc["id"]] = (path, source)
+    async for doc in db.blog_posts.find({"id": {"$in": list(stale)}}, {"_id": 0}):
+        path, source = stale[doc["id"]]
+        run.emit(path, source, render_post(BlogPost(**doc), logo, lang))
+
+    posts = [BlogPostSummary(**doc) for doc in summaries]
+    source = digest(EXPORT_VERSION, [p.model_dump(mode="json") for p in posts], logo, lang)
+    if not run.is_current("blog/index.html", source):
+        run.emit("blog/index.html", source, render_blog_index(posts, logo, lang))
+    return run
+
+
+async def main(out: Path, force: bool, dry_run: bool):
+    try:
+        run = await export(out, force, dry_run)
+        removed = run.finish()
+    finally:
+        client.close()
+    verb = "Would write" if dry_run else "Wrote"
+    for path in run.written:
+        print(f"{verb} {path}")
+    for path in removed:
+        print(f"{'Would remove' if dry_run else 'Removed'} {path}")
+    print(f"{len(run.written)} written, {len(removed)} removed, {run.unchanged} unchanged")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT, help="static site directory (default: static-site/)")
+    parser.add_argument("--force", action="store_true", help="ignore the manifest and re-render every page")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    args = parser.parse_args()
+    asyncio.run(main(args.out, args.force, args.dry_run))
@@ -0,0 +1,28 @@
+"""Apply pending schema migrations without starting the API server.
+
+Usage: python migrate.py [--check]
+"""
+import argparse
+import asyncio
+
+from server import client, schema_migrations
+
+
+async def main(check_only: bool):
+    try:
+        if check_only:
+            version = await schema_migrations.check()
+            state = "current" if schema_migrations.is_current else "pending"
+            print(f"Schema version {version} of {schema_migrations.latest} ({state})")
+        else:
+            version = await schema_migrations.run()
+            print(f"Schema is at version {version}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="only report the current schema version")
+    args = parser.parse_args()
+    asyncio.run(main(args.check))
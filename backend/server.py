@@ -1,25 +1,51 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, Form, Query, Request, Response, BackgroundTasks
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
 import os
 import logging
+import mimetypes
+import smtplib
+from email.message import EmailMessage
+import mmap
+import multiprocessing
+import tempfile
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 import uuid
-from datetime import datetime, timezone, timedelta
+import time
+import math
+from datetime import datetime, timezone, timedelta, date
+from zoneinfo import ZoneInfo
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from abc import ABC, abstractmethod
 import jwt
 import bcrypt
 import base64
+import hashlib
+import re
+import copy
+import csv
+import io
+import json
+from email.utils import format_datetime, parsedate_to_datetime
+from markdown_it import MarkdownIt
+from xml.sax.saxutils import escape as xml_escape, quoteattr
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, tz_aware=True)
 db = client[os.environ['DB_NAME']]
 
 # JWT Settings
@@ -27,6 +53,130 @@ JWT_SECRET = os.environ.get('JWT_SECRET', 'star-trade-secret-key-2024')
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24
 
+# Auth Cache
+AUTH_CACHE_SIZE = int(os.environ.get('AUTH_CACHE_SIZE', '1024'))
+AUTH_USER_TTL = float(os.environ.get('AUTH_USER_TTL', '30'))
+
+# Password Hashing
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '2'))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', '16'))
+
+# Rate Limiting: comma-separated "<route>:<key>=<burst>/<seconds>" rules
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')  # memory | mongo
+RATE_LIMIT_MAX_KEYS = int(os.environ.get('RATE_LIMIT_MAX_KEYS', '100000'))
+RATE_LIMITS = os.environ.get(
+    'RATE_LIMITS',
+    'contact:ip=5/60,contact:email=3/600,login:ip=20/60,login:email=5/300,register:ip=3/3600'
+)
+# Number of reverse proxies in front of the app that append to X-Forwarded-For.
+# Must be set behind an ingress/load balancer: at 0 every visitor shares the
+# proxy's address, so the per-IP limits above become site-wide limits.
+# Test deployments can raise the limits instead, e.g. RATE_LIMITS="login:email=50/300".
+TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', '0'))
+
+# Cache Settings
+SETTINGS_CACHE_TTL = float(os.environ.get('SETTINGS_CACHE_TTL', '60'))
+CONTENT_CACHE_TTL = float(os.environ.get('CONTENT_CACHE_TTL', '300'))
+# Schema Migrations
+RUN_MIGRATIONS_ON_STARTUP = os.environ.get('RUN_MIGRATIONS_ON_STARTUP', 'true').lower() == 'true'
+MIGRATION_BATCH_SIZE = int(os.environ.get('MIGRATION_BATCH_SIZE', '500'))
+
+# Pagination
+DEFAULT_PAGE_SIZE = int(os.environ.get('DEFAULT_PAGE_SIZE', '100'))
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', '500'))
+
+# Blog Search
+BLOG_SEARCH_LANGUAGE = os.environ.get('BLOG_SEARCH_LANGUAGE', 'portuguese')  # stemming and stop words
+SEARCH_PAGE_SIZE = int(os.environ.get('SEARCH_PAGE_SIZE', '12'))
+SEARCH_MAX_FACETS = int(os.environ.get('SEARCH_MAX_FACETS', '30'))
+
+# Sitemap & Feeds
+# Public origin of the frontend, e.g. https://startrade.com.br. The sitemap and
+# feeds answer 404 until it is set: the request's Host header is caller-controlled.
+SITE_URL = os.environ.get('SITE_URL', '').rstrip('/')
+SITE_NAME = os.environ.get('SITE_NAME', 'Star Trade')
+# Per-file limit of the sitemap protocol; larger archives get a sitemap index
+SITEMAP_MAX_URLS = int(os.environ.get('SITEMAP_MAX_URLS', '50000'))
+FEED_ITEMS = int(os.environ.get('FEED_ITEMS', '20'))
+SEO_CACHE_TTL = float(os.environ.get('SEO_CACHE_TTL', '3600'))
+
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '500'))
+
+# Media Storage
+MEDIA_STORAGE = os.environ.get('MEDIA_STORAGE', 'filesystem')  # filesystem | s3
+MEDIA_ROOT = Path(os.environ.get('MEDIA_ROOT', str(ROOT_DIR / 'uploads')))
+# Prefix for filesystem URLs; point it at a CDN that mirrors MEDIA_ROOT if there is one
+MEDIA_PUBLIC_URL = os.environ.get('MEDIA_PUBLIC_URL', '/api/media/files').rstrip('/')
+MEDIA_CHUNK_SIZE = int(os.environ.get('MEDIA_CHUNK_SIZE', str(1024 * 1024)))
+# Internal nginx location aliasing MEDIA_ROOT; when set, nginx sends the bytes with sendfile
+MEDIA_ACCEL_REDIRECT = os.environ.get('MEDIA_ACCEL_REDIRECT', '').rstrip('/')
+MEDIA_RANGE_CHUNK_SIZE = int(os.environ.get('MEDIA_RANGE_CHUNK_SIZE', str(256 * 1024)))
+CACHE_CONTROL_MEDIA = os.environ.get('CACHE_CONTROL_MEDIA', 'public, max-age=3600')
+CACHE_CONTROL_MEDIA_IMMUTABLE = 'public, max-age=31536000, immutable'
+# Longest a stored-file write or delete may hold its checksum; covers slow S3 uploads
+MEDIA_BLOB_LEASE = float(os.environ.get('MEDIA_BLOB_LEASE', '900'))
+MAX_UPLOAD_SIZE = int(os.environ.get('MAX_UPLOAD_SIZE', str(512 * 1024 * 1024)))
+S3_BUCKET = os.environ.get('S3_BUCKET', '')
+S3_ENDPOINT_URL = os.environ.get('S3_ENDPOINT_URL') or None  # e.g. http://localhost:9000 for MinIO
+S3_PUBLIC_URL = os.environ.get('S3_PUBLIC_URL', '').rstrip('/')
+
+# Dashboard Statistics
+STATS_CACHE_TTL = float(os.environ.get('STATS_CACHE_TTL', '5'))
+STATS_TIMEZONE = os.environ.get('STATS_TIMEZONE', 'America/Sao_Paulo')
+STATS_DAYS = int(os.environ.get('STATS_DAYS', '30'))
+STATS_WEEKS = int(os.environ.get('STATS_WEEKS', '12'))
+STATS_MONTHS = int(os.environ.get('STATS_MONTHS', '12'))
+
+# Contact Ingestion
+CONTACT_QUEUE_MAX_SIZE = int(os.environ.get('CONTACT_QUEUE_MAX_SIZE', '10000'))
+CONTACT_BATCH_SIZE = int(os.environ.get('CONTACT_BATCH_SIZE', '100'))
+CONTACT_FLUSH_INTERVAL = float(os.environ.get('CONTACT_FLUSH_INTERVAL', '0.5'))
+CONTACT_FLUSH_RETRIES = int(os.environ.get('CONTACT_FLUSH_RETRIES', '5'))
+
+# Message Event Stream
+SSE_HEARTBEAT_INTERVAL = float(os.environ.get('SSE_HEARTBEAT_INTERVAL', '15'))
+SSE_QUEUE_SIZE = int(os.environ.get('SSE_QUEUE_SIZE', '100'))
+# Lifetime of the single-purpose token EventSource puts in the stream URL
+STREAM_TOKEN_SECONDS = int(os.environ.get('STREAM_TOKEN_SECONDS', '60'))
+
+# Email Notifications (disabled unless SMTP_HOST is set)
+SMTP_HOST = os.environ.get('SMTP_HOST', '')
+SMTP_PORT = int(os.environ.get('SMTP_PORT', '25'))
+SMTP_USERNAME = os.environ.get('SMTP_USERNAME', '')
+SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD', '')
+SMTP_STARTTLS = os.environ.get('SMTP_STARTTLS', 'false').lower() == 'true'
+EMAIL_FROM = os.environ.get('EMAIL_FROM', 'no-reply@startrade.com.br')
+# Defaults to the contact email in site settings
+LEAD_NOTIFICATION_EMAIL = os.environ.get('LEAD_NOTIFICATION_EMAIL', '')
+EMAIL_CONCURRENCY = int(os.environ.get('EMAIL_CONCURRENCY', '4'))
+EMAIL_MAX_ATTEMPTS = int(os.environ.get('EMAIL_MAX_ATTEMPTS', '8'))
+EMAIL_SEND_TIMEOUT = float(os.environ.get('EMAIL_SEND_TIMEOUT', '30'))
+EMAIL_POLL_INTERVAL = float(os.environ.get('EMAIL_POLL_INTERVAL', '1'))
+
+# Image Derivatives
+IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', '1'))
+IMAGE_VARIANT_WIDTHS = [int(w) for w in os.environ.get('IMAGE_VARIANT_WIDTHS', '320,640,1024,1920').split(',')]
+# "source" keeps the uploaded format; avif is skipped if Pillow lacks support
+IMAGE_VARIANT_FORMATS = os.environ.get('IMAGE_VARIANT_FORMATS', 'source,webp').split(',')
+IMAGE_VARIANT_QUALITY = int(os.environ.get('IMAGE_VARIANT_QUALITY', '80'))
+
+ENSURE_INDEXES_ON_STARTUP = os.environ.get('ENSURE_INDEXES_ON_STARTUP', 'true').lower() == 'true'
+
+CONTENT_VERSION_POLL_INTERVAL = float(os.environ.get('CONTENT_VERSION_POLL_INTERVAL', '2'))
+# "no-cache" lets browsers and CDNs store the body but revalidate every time,
+# which is a cheap 304 thanks to ETags. Raise max-age per route if needed.
+CACHE_CONTROL = {
+    "settings": os.environ.get('CACHE_CONTROL_SETTINGS', 'public, no-cache'),
+    "areas": os.environ.get('CACHE_CONTROL_AREAS', 'public, no-cache'),
+    "blog": os.environ.get('CACHE_CONTROL_BLOG', 'public, no-cache'),
+    "blog_post": os.environ.get('CACHE_CONTROL_BLOG_POST', 'public, no-cache'),
+    "landing": os.environ.get('CACHE_CONTROL_LANDING', 'public, no-cache'),
+    "seo": os.environ.get('CACHE_CONTROL_SEO', 'public, no-cache'),
+    "stats": 'private, no-cache',
+}
+
 security = HTTPBearer()
 
 # Create the main app
@@ -246,14 +396,54 @@ class BlogPostCreate(BaseModel):
     meta_description: str = ""
     related_area_id: str = ""
 
+class TocEntry(BaseModel):
+    level: int
+    text: str
+    anchor: str
+
 class BlogPost(BlogPostCreate):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     slug: str = ""
     author_name: str = "Admin"
+    # Rendered from content on every write
+    content_html: str = ""
+    toc: List[TocEntry] = []
+    word_count: int = 0
+    reading_time: int = 0
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+# What list views render; the article body is only served by /blog/{post_id}
+class BlogPostSummary(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    slug: str = ""
+    title: str
+    excerpt: str
+    cover_image: str = ""
+    category: str = ""
+    tags: List[str] = []
+    is_featured: bool = False
+    is_published: bool = True
+    related_area_id: str = ""
+    author_name: str = "Admin"
+    reading_time: int = 0
+    created_at: datetime
+    updated_at: datetime
+
+class SearchFacet(BaseModel):
+    value: str
+    count: int
+
+class BlogSearchResults(BaseModel):
+    posts: List[BlogPostSummary]
+    total: int
+    page: int
+    limit: int
+    tags: List[SearchFacet]
+    categories: List[SearchFacet]
+
 # Contact Messages
 class ContactMessageCreate(BaseModel):
     name: str
@@ -270,6 +460,14 @@ class ContactMessage(ContactMessageCreate):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 # Media
+class ImageVariant(BaseModel):
+    width: int
+    height: int
+    format: str
+    url: str
+    size: int = 0
+    storage_key: str = ""
+
 class MediaFile(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -277,46 +475,609 @@ class MediaFile(BaseModel):
     url: str
     file_type: str
     size: int = 0
+    checksum: str = ""  # SHA-256 of the stored bytes; uploads of the same bytes share one blob
+    storage_key: str = ""
+    width: int = 0
+    height: int = 0
+    variants: List[ImageVariant] = []  # resized copies, smallest first
     folder: str = "general"
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+# Landing page bootstrap
+class LandingPayload(BaseModel):
+    settings: SiteSettings
+    areas: List[Area]
+    blog_posts: List[BlogPostSummary]
+
+# Dashboard statistics
+class StatsPoint(BaseModel):
+    label: str
+    count: int
+
+class DashboardStats(BaseModel):
+    total_messages: int
+    unread_messages: int
+    total_posts: int
+    published_posts: int
+    total_areas: int
+    messages_per_day: List[StatsPoint]
+    messages_per_week: List[StatsPoint]
+    posts_per_month: List[StatsPoint]
+    leads_by_area: List[StatsPoint]  # over the same window as the message series
+    generated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+# ============ RESPONSE CACHE ============
+
+class CachedResponse:
+    """Validated model kept together with its serialized JSON body"""
+    __slots__ = ("value", "body", "etag", "last_modified", "expires_at")
+
+    def __init__(self, value, body: bytes, ttl: float, key: str = ""):
+        self.value = value
+        self.body = body
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self.last_modified = last_modified_of(value, key)
+        self.expires_at = time.monotonic() + ttl
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+class ResponseCache:
+    """In-process cache for hot public reads.
+
+    Entries are replaced as a whole, so readers always see either the old or
+    the new value. The TTL bounds how long edits made directly in Mongo stay
+    invisible.
+
+    A load that overlaps an invalidation may have read the old document, so
+    set() skips storing it when given the generation read before the load.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, CachedResponse] = {}
+        self.generation = 0
+        # Generation at which each prefix was last invalidated
+        self._invalidated: Dict[str, int] = {}
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None or not entry.is_fresh():
+            return None
+        return entry
+
+    def set(self, key: str, value, ttl: float, body: Optional[bytes] = None,
+            generation: Optional[int] = None) -> CachedResponse:
+        """Store value under key, unless key was invalidated after generation"""
+        entry = CachedResponse(value, dump_json(value) if body is None else body, ttl, key)
+        if generation is None or not self.invalidated_since(key, generation):
+            self._entries[key] = entry
+        return entry
+
+    def invalidated_since(self, key: str, generation: int) -> bool:
+        return any(key.startswith(prefix) and seen > generation for prefix, seen in self._invalidated.items())
+
+    def invalidate(self, prefix: str = ""):
+        self.generation += 1
+        self._invalidated[prefix] = self.generation
+        for key in [k for k in self._entries if k.startswith(prefix)]:
+            self._entries.pop(key, None)
+
+response_cache = ResponseCache()
+
+def dump_json(value) -> bytes:
+    """Serialize a model or a list of models the same way response_model does"""
+    if isinstance(value, list):
+        return b"[" + b",".join(item.model_dump_json().encode() for item in value) + b"]"
+    return value.model_dump_json().encode()
+
+async def cached(key: str, loader, ttl: float) -> CachedResponse:
+    entry = response_cache.get(key)
+    if entry is None:
+        generation = response_cache.generation
+        entry = response_cache.set(key, await loader(), ttl, generation=generation)
+    return entry
+
+def last_modified_of(value, key: str = "") -> Optional[datetime]:
+    """Newest of the model's updated_at and the last write to any collection key depends on.
+
+    updated_at alone isn't enough for lists, aggregates and feeds: deleting a
+    post or editing an area moves no updated_at in them, so If-Modified-Since
+    would wrongly answer 304. ContentVersions.bump records when each
+    collection last changed.
+    """
+    stamps = [getattr(value, "updated_at", None)]
+    if key:
+        stamps += [content_versions.changed_at.get(name) for name, prefixes in CACHED_COLLECTIONS.items()
+                   if any(key.startswith(prefix) for prefix in prefixes)]
+    stamps = [as_utc(stamp) for stamp in stamps if stamp is not None]
+    if not stamps:
+        return None
+    return max(stamps).astimezone(timezone.utc).replace(microsecond=0)
+
+def is_not_modified(request: Request, entry: CachedResponse) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence and uses weak comparison (RFC 9110)
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or entry.etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and entry.last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return entry.last_modified <= since
+    return False
+
+def json_response(entry: CachedResponse, request: Request, route: str, headers: Optional[dict] = None,
+                  media_type: str = "application/json") -> Response:
+    headers = {**(headers or {}), "ETag": entry.etag, "Cache-Control": CACHE_CONTROL[route]}
+    if entry.last_modified:
+        headers["Last-Modified"] = format_datetime(entry.last_modified, usegmt=True)
+    if is_not_modified(request, entry):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type=media_type, headers=headers)
+
+# ============ CACHE COHERENCE ============
+
+# Cache key prefixes to drop when each collection changes
+CACHED_COLLECTIONS = {
+    # Area projections fall back to settings.default_language
+    "settings": ("settings", "areas", "landing", "seo"),
+    "areas": ("areas", "landing", "stats", "seo"),
+    "blog": ("blog", "landing", "stats", "seo"),
+    "messages": ("stats",),
+    # Users and revoked tokens live in the auth cache instead
+    "auth": (),
+}
+
+def invalidate_collection(name: str):
+    for prefix in CACHED_COLLECTIONS[name]:
+        response_cache.invalidate(prefix)
+    if name == "auth":
+        auth_cache.clear()
+    elif name == "messages":
+        message_events.changed()
+
+class ContentVersions:
+    """Keeps response caches coherent across uvicorn workers.
+
+    Every write bumps a counter in the shared ``content_version`` document
+    and stamps ``<collection>_at``, which serves as Last-Modified for
+    everything cached from that collection.
+    Each worker polls that document and drops its cache entries for any
+    collection whose counter moved, so a stale entry survives at most
+    CONTENT_VERSION_POLL_INTERVAL seconds after an admin edit. Loads still in
+    flight when the entries are dropped don't store their results (see
+    ResponseCache.set).
+    """
+
+    def __init__(self):
+        self.seen: Dict[str, int] = {}
+        self.changed_at: Dict[str, datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def bump(self, name: str) -> int:
+        # Call after the write so no reader can re-cache the old document
+        now = datetime.now(timezone.utc)
+        self.changed_at[name] = now
+        invalidate_collection(name)
+        doc = await db.content_version.find_one_and_update(
+            {"id": "content_version"},
+            {"$inc": {name: 1}, "$set": {f"{name}_at": now}},
+            projection={"_id": 0},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return doc[name]
+
+    async def refresh(self):
+        doc = await db.content_version.find_one({"id": "content_version"}, {"_id": 0}) or {}
+        for name in CACHED_COLLECTIONS:
+            version = doc.get(name, 0)
+            if self.seen.get(name) != version:
+                self.seen[name] = version
+                if doc.get(f"{name}_at"):
+                    self.changed_at[name] = as_utc(doc[f"{name}_at"])
+                invalidate_collection(name)
+
+    async def watch(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Failed to poll content_version")
+            await asyncio.sleep(CONTENT_VERSION_POLL_INTERVAL)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.watch())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+content_versions = ContentVersions()
+
+# ============ LANGUAGE PROJECTION ============
+
+LANGUAGES = ("pt", "en", "es")
+# Area fields stored as <field> (Portuguese) plus <field>_en / <field>_es
+AREA_TRANSLATED_FIELDS = ("title", "description", "badge_text", "button_text")
+
+def resolve_language(lang: Optional[str]) -> Optional[str]:
+    if lang is not None and lang not in LANGUAGES:
+        raise HTTPException(status_code=400, detail=f"Unsupported language, use one of: {', '.join(LANGUAGES)}")
+    return lang
+
+def project_translatable(data, lang: str, fallback: str):
+    """Replace every {pt, en, es} object with the text for a single language"""
+    if isinstance(data, dict):
+        if data.keys() == set(LANGUAGES):
+            return data.get(lang) or data.get(fallback) or ""
+        return {key: project_translatable(value, lang, fallback) for key, value in data.items()}
+    if isinstance(data, list):
+        return [project_translatable(value, lang, fallback) for value in data]
+    return data
+
+def project_area(area: dict, lang: str, fallback: str) -> dict:
+    """Collapse title/title_en/title_es style fields into a single field"""
+    projected = dict(area)
+    for field in AREA_TRANSLATED_FIELDS:
+        texts = {"pt": projected.pop(field, "")}
+        for code in LANGUAGES[1:]:
+            texts[code] = projected.pop(f"{field}_{code}", "")
+        projected[field] = texts.get(lang) or texts.get(fallback) or texts["pt"]
+    return projected
+
+def project_settings(settings: SiteSettings, lang: str, fallback: str) -> dict:
+    return project_translatable(settings.model_dump(mode="json"), lang, fallback)
+
+def project_areas(areas: List[Area], lang: str, fallback: str) -> List[dict]:
+    return [project_area(area.model_dump(mode="json"), lang, fallback) for area in areas]
+
+def dump_projected_json(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+# ============ PAGINATION ============
+
+# Newest first, with id breaking ties between equal timestamps
+PAGE_SORT = [("created_at", DESCENDING), ("id", DESCENDING)]
+
+def encode_cursor(item) -> str:
+    """Opaque keyset cursor pointing just after item"""
+    raw = json.dumps({"created_at": item.created_at.isoformat(), "id": item.id})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        created_at = datetime.fromisoformat(data["created_at"])
+        item_id = str(data["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": item_id}},
+    ]}
+
+def page_query(query: dict, cursor: Optional[str]) -> dict:
+    if not cursor:
+        return query
+    after = decode_cursor(cursor)
+    return {"$and": [query, after]} if query else after
+
+async def find_page(collection, query: dict, cursor: Optional[str], limit: int, projection: Optional[dict] = None) -> List[dict]:
+    return await collection.find(page_query(query, cursor), projection or {"_id": 0}) \
+        .sort(PAGE_SORT).limit(limit).to_list(limit)
+
+async def page_headers(collection, query: dict, items: list, limit: int, include_total: bool) -> dict:
+    headers = {}
+    if len(items) == limit:
+        headers["X-Next-Cursor"] = encode_cursor(items[-1])
+    if include_total:
+        headers["X-Total-Count"] = str(await collection.count_documents(query))
+    return headers
+
 # ============ AUTH HELPERS ============
 
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
 
 def verify_password(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password.encode(), hashed.encode())
 
+class PasswordHasher:
+    """Runs bcrypt on a small dedicated thread pool.
+
+    bcrypt takes 100-300 ms of CPU per call, which would otherwise stall the
+    event loop. Once max_pending calls are queued or running, new ones fail
+    fast with 503 instead of piling up behind the pool.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication is busy, try again shortly",
+                headers={"Retry-After": "1"}
+            )
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(verify_password, password, hashed)
+
+    def metrics(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
+
 def create_token(user_id: str, email: str) -> str:
     expiration = datetime.now(timezone.utc) + timedelta(hours=JWT_EXPIRATION_HOURS)
     payload = {"user_id": user_id, "email": email, "exp": expiration}
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
+def create_stream_token(session_token: str) -> str:
+    """Short-lived token for the event stream URL, tied to the session that asked for it.
+
+    EventSource can't send headers, so this ends up in query strings and access
+    logs; it is useless anywhere else and expires before a leaked copy matters.
+    """
+    session = jwt.decode(session_token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    expiration = min(
+        datetime.now(timezone.utc) + timedelta(seconds=STREAM_TOKEN_SECONDS),
+        datetime.fromtimestamp(session["exp"], timezone.utc)
+    )
+    payload = {
+        "user_id": session["user_id"],
+        "purpose": "stream",
+        "sid": token_digest(session_token),
+        "session_exp": session["exp"],
+        "exp": expiration,
+    }
+    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+class AuthCache:
+    """Bounded LRU of verified tokens plus short-lived user records.
+
+    A verified token stays cached until its JWT ``exp``; user records expire
+    after AUTH_USER_TTL seconds so role or account changes made elsewhere
+    show up quickly. Writes to users or revoked_tokens bump the "auth"
+    content version, which clears this cache in every worker.
+    """
+
+    def __init__(self, max_size: int, user_ttl: float):
+        self.max_size = max_size
+        self.user_ttl = user_ttl
+        self._tokens: "OrderedDict[str, tuple]" = OrderedDict()
+        self._users: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def _get(self, entries: OrderedDict, key: str, now: float):
+        item = entries.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if now >= expires_at:
+            entries.pop(key, None)
+            return None
+        entries.move_to_end(key)
+        return value
+
+    def _put(self, entries: OrderedDict, key: str, value, expires_at: float):
+        entries[key] = (value, expires_at)
+        entries.move_to_end(key)
+        while len(entries) > self.max_size:
+            entries.popitem(last=False)
+
+    def user_id_for(self, token: str) -> Optional[str]:
+        return self._get(self._tokens, token, time.time())
+
+    def remember_token(self, token: str, user_id: str, exp: float):
+        self._put(self._tokens, token, user_id, exp)
+
+    def forget_token(self, token: str):
+        self._tokens.pop(token, None)
+
+    def user(self, user_id: str) -> Optional[dict]:
+        return self._get(self._users, user_id, time.monotonic())
+
+    def remember_user(self, user_id: str, user: dict):
+        self._put(self._users, user_id, user, time.monotonic() + self.user_ttl)
+
+    def clear(self):
+        self._tokens.clear()
+        self._users.clear()
+
+auth_cache = AuthCache(AUTH_CACHE_SIZE, AUTH_USER_TTL)
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    try:
-        payload = jwt.decode(credentials.credentials, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        user = await db.users.find_one({"id": payload["user_id"]}, {"_id": 0, "password": 0})
+    return await authenticate(credentials.credentials)
+
+async def authenticate(token: str) -> dict:
+    user_id = auth_cache.user_id_for(token)
+    if user_id is None:
+        try:
+            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        except jwt.ExpiredSignatureError:
+            raise HTTPException(status_code=401, detail="Token expired")
+        except jwt.InvalidTokenError:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        if payload.get("purpose"):
+            raise HTTPException(status_code=401, detail="Invalid token")
+        if await db.revoked_tokens.find_one({"token_hash": token_digest(token)}, {"_id": 1}):
+            raise HTTPException(status_code=401, detail="Token revoked")
+        user_id = payload["user_id"]
+        auth_cache.remember_token(token, user_id, payload["exp"])
+    
+    user = auth_cache.user(user_id)
+    if user is None:
+        user = await db.users.find_one({"id": user_id}, {"_id": 0, "password": 0})
         if not user:
+            auth_cache.forget_token(token)
             raise HTTPException(status_code=401, detail="User not found")
-        return user
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+        auth_cache.remember_user(user_id, user)
+    return dict(user)
+
+# ============ RATE LIMITING ============
+
+def parse_rate_limits(spec: str) -> Dict[str, tuple]:
+    """'login:ip=20/60' -> {"login:ip": (burst, tokens refilled per second)}"""
+    limits = {}
+    for rule in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, limit = rule.partition("=")
+        burst, _, period = limit.partition("/")
+        limits[name.strip()] = (float(burst), float(burst) / float(period))
+    return limits
+
+_proxy_hops_warned = False
+
+def client_ip(request: Request) -> str:
+    global _proxy_hops_warned
+    if not TRUSTED_PROXY_HOPS and not _proxy_hops_warned and "x-forwarded-for" in request.headers:
+        _proxy_hops_warned = True
+        logger.warning("X-Forwarded-For received but TRUSTED_PROXY_HOPS=0; per-IP rate limits apply to the proxy address")
+    if TRUSTED_PROXY_HOPS:
+        forwarded = [ip.strip() for ip in request.headers.get("x-forwarded-for", "").split(",") if ip.strip()]
+        if len(forwarded) >= TRUSTED_PROXY_HOPS:
+            return forwarded[-TRUSTED_PROXY_HOPS]
+    return request.client.host if request.client else "unknown"
+
+class MemoryRateLimitStore:
+    """Token buckets local to this worker, bounded as an LRU so key floods can't grow memory"""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    async def take(self, key: str, capacity: float, rate: float) -> float:
+        """Spend one token; returns 0 if allowed, otherwise seconds until a token is available"""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [capacity, now]
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / rate
+
+class MongoRateLimitStore:
+    """Token buckets shared by every worker, refilled and spent in one atomic update"""
+
+    async def take(self, key: str, capacity: float, rate: float) -> float:
+        now = time.time()
+        bucket = await db.rate_limits.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": {"$min": [capacity, {"$add": [
+                    {"$ifNull": ["$tokens", capacity]},
+                    {"$multiply": [{"$max": [0, {"$subtract": [now, {"$ifNull": ["$ts", now]}]}]}, rate]},
+                ]}]}}},
+                {"$set": {
+                    "allowed": {"$gte": ["$tokens", 1]},
+                    "tokens": {"$cond": [{"$gte": ["$tokens", 1]}, {"$subtract": ["$tokens", 1]}, "$tokens"]},
+                    "ts": now,
+                    # A bucket idle this long is full again, so the TTL index can drop it
+                    "expires_at": datetime.fromtimestamp(now + capacity / rate, timezone.utc),
+                }},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return 0.0 if bucket["allowed"] else (1 - bucket["tokens"]) / rate
+
+class RateLimiter:
+    """Per-route token buckets keyed by client IP, email, or both.
+
+    A request spends one token from every bucket configured for its route
+    and is rejected with 429 and Retry-After if any of them is empty.
+    """
+
+    def __init__(self, limits: Dict[str, tuple], store):
+        self.limits = limits
+        self.store = store
+        self.rejected: Dict[str, int] = {}
+
+    async def check(self, route: str, **keys: Optional[str]):
+        if not RATE_LIMIT_ENABLED:
+            return
+        retry_after = 0.0
+        for kind, value in keys.items():
+            limit = self.limits.get(f"{route}:{kind}")
+            if limit is None or not value:
+                continue
+            try:
+                retry_after = max(retry_after, await self.store.take(f"{route}:{kind}:{value}", *limit))
+            except Exception:
+                # Fail open: a store outage must not lock every visitor out
+                logger.exception(f"Rate limit store failed for {route}:{kind}")
+        if retry_after:
+            self.rejected[route] = self.rejected.get(route, 0) + 1
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+
+    def metrics(self) -> dict:
+        return {"enabled": RATE_LIMIT_ENABLED, "backend": RATE_LIMIT_BACKEND, "rejected": dict(self.rejected)}
+
+rate_limiter = RateLimiter(
+    parse_rate_limits(RATE_LIMITS),
+    MongoRateLimitStore() if RATE_LIMIT_BACKEND == "mongo" else MemoryRateLimitStore(RATE_LIMIT_MAX_KEYS)
+)
 
 # ============ AUTH ROUTES ============
 
 @api_router.post("/auth/register", response_model=TokenResponse)
-async def register(data: UserCreate):
+async def register(data: UserCreate, request: Request):
+    await rate_limiter.check("register", ip=client_ip(request), email=data.email.lower())
     existing = await db.users.find_one({"email": data.email})
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
     
     user = User(email=data.email, name=data.name, role="admin")
     user_dict = user.model_dump()
-    user_dict["password"] = hash_password(data.password)
-    user_dict["created_at"] = user_dict["created_at"].isoformat()
+    user_dict["password"] = await password_hasher.hash(data.password)
     
     await db.users.insert_one(user_dict)
     token = create_token(user.id, user.email)
@@ -324,9 +1085,11 @@ async def register(data: UserCreate):
     return TokenResponse(access_token=token, user=UserBase(email=user.email, name=user.name, role=user.role))
 
 @api_router.post("/auth/login", response_model=TokenResponse)
-async def login(data: UserLogin):
+async def login(data: UserLogin, request: Request):
+    # Checked before the user lookup so throttled attempts never reach bcrypt
+    await rate_limiter.check("login", ip=client_ip(request), email=data.email.lower())
     user = await db.users.find_one({"email": data.email}, {"_id": 0})
-    if not user or not verify_password(data.password, user["password"]):
+    if not user or not await password_hasher.verify(data.password, user["password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     token = create_token(user["id"], user["email"])
@@ -335,11 +1098,39 @@ async def login(data: UserLogin):
         user=UserBase(email=user["email"], name=user["name"], role=user.get("role", "editor"))
     )
 
+@api_router.post("/auth/logout")
+async def logout(credentials: HTTPAuthorizationCredentials = Depends(security), user: dict = Depends(get_current_user)):
+    token = credentials.credentials
+    payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    await db.revoked_tokens.update_one(
+        {"token_hash": token_digest(token)},
+        {"$set": {"expires_at": datetime.fromtimestamp(payload["exp"], timezone.utc)}},
+        upsert=True
+    )
+    auth_cache.forget_token(token)
+    await content_versions.bump("auth")
+    return {"message": "Logged out"}
+
 @api_router.get("/auth/me", response_model=UserBase)
 async def get_me(user: dict = Depends(get_current_user)):
     return UserBase(**user)
 
-# ============ SITE SETTINGS ROUTES ============
+# ============ SCHEMA MIGRATIONS ============
+
+SETTINGS_TRANSLATABLE_PATHS = [
+    "hero.title", "hero.subtitle", "hero.cta_text",
+    "about.title", "about.paragraph1", "about.paragraph2"
+]
+
+# Date fields that older releases stored as ISO strings
+DATE_FIELDS = {
+    "users": ("created_at",),
+    "settings": ("updated_at",),
+    "areas": ("created_at",),
+    "blog_posts": ("created_at", "updated_at"),
+    "contact_messages": ("created_at",),
+    "media": ("created_at",),
+}
 
 def migrate_translatable_fields(data: dict, field_paths: list) -> dict:
     """Migrate old string fields to TranslatableText format"""
@@ -359,8 +1150,222 @@ def migrate_translatable_fields(data: dict, field_paths: list) -> dict:
                     current[final_key] = {"pt": value, "en": value, "es": value}
     return data
 
-@api_router.get("/settings", response_model=SiteSettings)
-async def get_settings():
+def migrate_settings_document(settings: dict) -> dict:
+    """Bring a legacy settings document up to the TranslatableText schema"""
+    settings = migrate_translatable_fields(settings, SETTINGS_TRANSLATABLE_PATHS)
+    
+    # Migrate differentials
+    for diff in settings.get("differentials") or []:
+        if isinstance(diff.get("title"), str):
+            diff["title"] = {"pt": diff["title"], "en": diff["title"], "es": diff["title"]}
+        if isinstance(diff.get("description"), str):
+            diff["description"] = {"pt": diff["description"], "en": diff["description"], "es": diff["description"]}
+    
+    # Migrate stats
+    for stat in settings.get("stats") or []:
+        if isinstance(stat.get("label"), str):
+            stat["label"] = {"pt": stat["label"], "en": stat["label"], "es": stat["label"]}
+    return settings
+
+async def migrate_settings_translations():
+    settings = await db.settings.find_one({"id": "site_settings"}, {"_id": 0})
+    if not settings:
+        return
+    migrated = migrate_settings_document(copy.deepcopy(settings))
+    if migrated != settings:
+        await db.settings.update_one({"id": "site_settings"}, {"$set": migrated})
+
+async def migrate_iso_dates():
+    for collection, fields in DATE_FIELDS.items():
+        for field in fields:
+            cursor = db[collection].find({field: {"$type": "string"}}, {"_id": 1, field: 1})
+            batch = []
+            async for doc in cursor:
+                value = datetime.fromisoformat(doc[field])
+                if value.tzinfo is None:
+                    value = value.replace(tzinfo=timezone.utc)
+                batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": {field: value}}))
+                if len(batch) >= MIGRATION_BATCH_SIZE:
+                    await db[collection].bulk_write(batch, ordered=False)
+                    batch = []
+            if batch:
+                await db[collection].bulk_write(batch, ordered=False)
+
+async def migrate_rendered_blog_posts():
+    cursor = db.blog_posts.find(
+        {"render_version": {"$not": {"$gte": BLOG_RENDER_VERSION}}},
+        {"_id": 1, "content": 1}
+    )
+    batch = []
+    async for doc in cursor:
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": render_blog_content(doc.get("content", ""))}))
+        if len(batch) >= MIGRATION_BATCH_SIZE:
+            await db.blog_posts.bulk_write(batch, ordered=False)
+            batch = []
+    if batch:
+        await db.blog_posts.bulk_write(batch, ordered=False)
+
+async def migrate_duplicate_slugs():
+    # Posts created before slugs were de-duplicated would block slug_unique.
+    # The oldest post keeps a shared slug; empty or missing slugs are all renamed.
+    duplicates = db.blog_posts.aggregate([
+        {"$sort": {"created_at": ASCENDING, "id": ASCENDING}},
+        {"$group": {"_id": "$slug", "posts": {"$push": {"id": "$id", "title": "$title"}}, "count": {"$sum": 1}}},
+        {"$match": {"$or": [{"count": {"$gt": 1}}, {"_id": {"$in": [None, ""]}}]}},
+    ], allowDiskUse=True)
+    async for group in duplicates:
+        renamed = group["posts"] if group["_id"] in (None, "") else group["posts"][1:]
+        for post in renamed:
+            slug = await unique_slug(post.get("title") or "", post["id"])
+            await db.blog_posts.update_one({"id": post["id"]}, {"$set": {"slug": slug}})
+
+# Append only; each step must be idempotent since workers may race at startup
+MIGRATIONS = [
+    (1, "TranslatableText fields in site settings", migrate_settings_translations),
+    (2, "ISO date strings to native dates", migrate_iso_dates),
+    (3, "Pre-rendered blog post HTML", migrate_rendered_blog_posts),
+    (4, "Unique blog post slugs", migrate_duplicate_slugs),
+]
+
+class SchemaMigrations:
+    """Versioned, one-shot rewrites of legacy documents.
+
+    The applied version is recorded in the ``migrations`` collection. Once it
+    is current the read path skips all legacy conversion logic.
+    """
+
+    def __init__(self):
+        self.is_current = False
+
+    @property
+    def latest(self) -> int:
+        return MIGRATIONS[-1][0]
+
+    async def version(self) -> int:
+        doc = await db.migrations.find_one({"id": "schema_version"}, {"_id": 0})
+        return doc["version"] if doc else 0
+
+    async def check(self) -> int:
+        version = await self.version()
+        self.is_current = version >= self.latest
+        return version
+
+    async def run(self) -> int:
+        version = await self.version()
+        for number, description, migration in MIGRATIONS:
+            if number <= version:
+                continue
+            logger.info(f"Applying schema migration {number}: {description}")
+            await migration()
+            await db.migrations.update_one(
+                {"id": "schema_version"},
+                {"$set": {"version": number, "applied_at": datetime.now(timezone.utc)}},
+                upsert=True
+            )
+            version = number
+        self.is_current = True
+        return version
+
+schema_migrations = SchemaMigrations()
+
+# ============ INDEXES ============
+
+def id_index() -> IndexModel:
+    return IndexModel([("id", ASCENDING)], name="id_unique", unique=True)
+
+# Every query shape the API issues, per collection
+INDEXES = {
+    "users": [
+        id_index(),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "settings": [id_index()],
+    "areas": [
+        id_index(),
+        IndexModel([("order", ASCENDING)], name="order"),
+    ],
+    "blog_posts": [
+        id_index(),
+        IndexModel([("slug", ASCENDING)], name="slug_unique", unique=True),
+        IndexModel(PAGE_SORT, name="created_at_id"),
+        IndexModel([("is_published", ASCENDING)] + PAGE_SORT, name="published_created_at_id"),
+        IndexModel(
+            [("title", TEXT), ("excerpt", TEXT), ("content", TEXT), ("tags", TEXT)],
+            name="blog_text",
+            weights={"title": 10, "tags": 5, "excerpt": 3, "content": 1},
+            default_language=BLOG_SEARCH_LANGUAGE,
+            # Posts have no per-document language; keep a future "language" field from overriding it
+            language_override="text_search_language"
+        ),
+    ],
+    "contact_messages": [
+        id_index(),
+        IndexModel(PAGE_SORT, name="created_at_id"),
+        IndexModel([("is_read", ASCENDING)], name="is_read"),
+    ],
+    "media": [
+        id_index(),
+        IndexModel(PAGE_SORT, name="created_at_id"),
+        IndexModel([("folder", ASCENDING)] + PAGE_SORT, name="folder_created_at_id"),
+        IndexModel([("checksum", ASCENDING)], name="checksum"),
+    ],
+    "media_blobs": [
+        # One stored file per checksum; also what makes the lease in MediaBlobs exclusive
+        IndexModel([("checksum", ASCENDING)], name="checksum_unique", unique=True),
+    ],
+    "revoked_tokens": [
+        IndexModel([("token_hash", ASCENDING)], name="token_hash_unique", unique=True),
+        # Revocations are only needed until the token would have expired anyway
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "email_outbox": [
+        id_index(),
+        IndexModel([("idempotency_key", ASCENDING)], name="idempotency_key_unique", unique=True),
+        IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)], name="status_next_attempt_at"),
+    ],
+    "rate_limits": [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "content_version": [id_index()],
+    "migrations": [id_index()],
+}
+
+class IndexManager:
+    """Creates the declared indexes and reports drift from the declaration"""
+
+    async def ensure(self):
+        # create_indexes is a no-op for indexes that already exist
+        for collection, indexes in INDEXES.items():
+            for index in indexes:
+                try:
+                    await db[collection].create_indexes([index])
+                except OperationFailure as e:
+                    # e.g. duplicate emails or slugs already in the data
+                    logger.error(f"Could not create index {collection}.{index.document['name']}: {e}")
+
+    async def report(self) -> dict:
+        report = {}
+        for collection, indexes in INDEXES.items():
+            existing = set()
+            async for index in db[collection].list_indexes():
+                existing.add(index["name"])
+            declared = {index.document["name"] for index in indexes}
+            unused = []
+            async for stats in db[collection].aggregate([{"$indexStats": {}}]):
+                if stats["name"] != "_id_" and stats["accesses"]["ops"] == 0:
+                    unused.append(stats["name"])
+            report[collection] = {
+                "missing": sorted(declared - existing),
+                "undeclared": sorted(existing - declared - {"_id_"}),
+                "unused": sorted(unused),
+            }
+        return report
+
+index_manager = IndexManager()
+
+# ============ SITE SETTINGS ROUTES ============
+
+async def load_settings() -> SiteSettings:
     settings = await db.settings.find_one({"id": "site_settings"}, {"_id": 0})
     if not settings:
         default = SiteSettings()
@@ -390,48 +1395,48 @@ async def get_settings():
             StatItem(value="50+", label=TranslatableText(pt="Containers/Mês", en="Containers/Month", es="Contenedores/Mes"), order=2),
             StatItem(value="8+", label=TranslatableText(pt="Anos de Experiência", en="Years of Experience", es="Años de Experiencia"), order=3),
         ]
-        settings_dict = default.model_dump()
-        settings_dict["updated_at"] = settings_dict["updated_at"].isoformat()
-        await db.settings.insert_one(settings_dict)
+        await db.settings.insert_one(default.model_dump())
         return default
     
-    # Migrate old string fields to TranslatableText
-    translatable_paths = [
-        "hero.title", "hero.subtitle", "hero.cta_text",
-        "about.title", "about.paragraph1", "about.paragraph2"
-    ]
-    settings = migrate_translatable_fields(settings, translatable_paths)
-    
-    # Migrate differentials
-    if "differentials" in settings:
-        for diff in settings["differentials"]:
-            if isinstance(diff.get("title"), str):
-                diff["title"] = {"pt": diff["title"], "en": diff["title"], "es": diff["title"]}
-            if isinstance(diff.get("description"), str):
-                diff["description"] = {"pt": diff["description"], "en": diff["description"], "es": diff["description"]}
-    
-    # Migrate stats
-    if "stats" in settings:
-        for stat in settings["stats"]:
-            if isinstance(stat.get("label"), str):
-                stat["label"] = {"pt": stat["label"], "en": stat["label"], "es": stat["label"]}
-    
-    if isinstance(settings.get("updated_at"), str):
-        settings["updated_at"] = datetime.fromisoformat(settings["updated_at"])
+    if not schema_migrations.is_current:
+        settings = migrate_settings_document(settings)
     return SiteSettings(**settings)
 
+async def cached_projection(base_key: str, loader, ttl: float, lang: Optional[str], project) -> CachedResponse:
+    """Cached entry for base_key, or its single-language projection.
+
+    Each language is cached under its own key so the projection runs once
+    per content version rather than once per request.
+    """
+    base = await cached(base_key, loader, ttl)
+    if lang is None:
+        return base
+    key = f"{base_key}:{lang}"
+    entry = response_cache.get(key)
+    if entry is None:
+        generation = response_cache.generation
+        settings = (await cached("settings", load_settings, SETTINGS_CACHE_TTL)).value
+        body = dump_projected_json(project(base.value, lang, settings.default_language))
+        entry = response_cache.set(key, base.value, ttl, body=body, generation=generation)
+    return entry
+
+@api_router.get("/settings", response_model=SiteSettings)
+async def get_settings(request: Request, lang: Optional[str] = None):
+    lang = resolve_language(lang)
+    entry = await cached_projection("settings", load_settings, SETTINGS_CACHE_TTL, lang, project_settings)
+    return json_response(entry, request, "settings")
+
 @api_router.put("/settings", response_model=SiteSettings)
 async def update_settings(settings: SiteSettings, user: dict = Depends(get_current_user)):
     settings.updated_at = datetime.now(timezone.utc)
-    settings_dict = settings.model_dump()
-    settings_dict["updated_at"] = settings_dict["updated_at"].isoformat()
-    await db.settings.update_one({"id": "site_settings"}, {"$set": settings_dict}, upsert=True)
+    await db.settings.update_one({"id": "site_settings"}, {"$set": settings.model_dump()}, upsert=True)
+    await content_versions.bump("settings")
+    response_cache.set("settings", settings, SETTINGS_CACHE_TTL)
     return settings
 
 # ============ AREAS ROUTES ============
 
-@api_router.get("/areas", response_model=List[Area])
-async def get_areas():
+async def load_areas() -> List[Area]:
     areas = await db.areas.find({}, {"_id": 0}).sort("order", 1).to_list(100)
     if not areas:
         # Seed default areas
@@ -472,23 +1477,22 @@ async def get_areas():
                 order=3
             ),
         ]
-        for area in default_areas:
-            area_dict = area.model_dump()
-            area_dict["created_at"] = area_dict["created_at"].isoformat()
-            await db.areas.insert_one(area_dict)
+        await db.areas.insert_many([area.model_dump() for area in default_areas])
         return default_areas
     
-    for area in areas:
-        if isinstance(area.get("created_at"), str):
-            area["created_at"] = datetime.fromisoformat(area["created_at"])
     return [Area(**a) for a in areas]
 
+@api_router.get("/areas", response_model=List[Area])
+async def get_areas(request: Request, lang: Optional[str] = None):
+    lang = resolve_language(lang)
+    entry = await cached_projection("areas", load_areas, CONTENT_CACHE_TTL, lang, project_areas)
+    return json_response(entry, request, "areas")
+
 @api_router.post("/areas", response_model=Area)
 async def create_area(data: AreaCreate, user: dict = Depends(get_current_user)):
     area = Area(**data.model_dump())
-    area_dict = area.model_dump()
-    area_dict["created_at"] = area_dict["created_at"].isoformat()
-    await db.areas.insert_one(area_dict)
+    await db.areas.insert_one(area.model_dump())
+    await content_versions.bump("areas")
     return area
 
 @api_router.put("/areas/{area_id}", response_model=Area)
@@ -499,10 +1503,9 @@ async def update_area(area_id: str, data: AreaCreate, user: dict = Depends(get_c
     
     update_data = data.model_dump()
     await db.areas.update_one({"id": area_id}, {"$set": update_data})
+    await content_versions.bump("areas")
     
     updated = await db.areas.find_one({"id": area_id}, {"_id": 0})
-    if isinstance(updated.get("created_at"), str):
-        updated["created_at"] = datetime.fromisoformat(updated["created_at"])
     return Area(**updated)
 
 @api_router.delete("/areas/{area_id}")
@@ -510,52 +1513,188 @@ async def delete_area(area_id: str, user: dict = Depends(get_current_user)):
     result = await db.areas.delete_one({"id": area_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Area not found")
+    await content_versions.bump("areas")
     return {"message": "Area deleted"}
 
 # ============ BLOG ROUTES ============
 
 def generate_slug(title: str) -> str:
-    import re
     slug = title.lower()
     slug = re.sub(r'[^\w\s-]', '', slug)
     slug = re.sub(r'[\s_-]+', '-', slug)
     return slug.strip('-')
 
-@api_router.get("/blog", response_model=List[BlogPost])
-async def get_blog_posts(published_only: bool = False):
-    query = {"is_published": True} if published_only else {}
-    posts = await db.blog_posts.find(query, {"_id": 0}).sort("created_at", -1).to_list(100)
-    
-    for post in posts:
-        if isinstance(post.get("created_at"), str):
-            post["created_at"] = datetime.fromisoformat(post["created_at"])
-        if isinstance(post.get("updated_at"), str):
-            post["updated_at"] = datetime.fromisoformat(post["updated_at"])
-    return [BlogPost(**p) for p in posts]
+# Bump when rendered output changes, with a migration that re-runs migrate_rendered_blog_posts
+BLOG_RENDER_VERSION = 1
+READING_WORDS_PER_MINUTE = 200
+
+# html=False escapes raw HTML in posts and markdown-it rejects javascript:,
+# vbscript: and data: links, so the output is safe to inject as-is
+markdown = MarkdownIt("commonmark", {"html": False, "breaks": True}).enable(["table", "strikethrough"])
+
+def inline_text(token) -> str:
+    return "".join(child.content for child in token.children or [] if child.type in ("text", "code_inline"))
+
+def render_blog_content(content: str) -> dict:
+    """Markdown body -> stored HTML with heading anchors, table of contents and reading stats"""
+    tokens = markdown.parse(content or "")
+    toc, anchors, words = [], set(), 0
+    for i, token in enumerate(tokens):
+        if token.type == "inline":
+            words += len(re.findall(r"\w+", inline_text(token)))
+        elif token.type in ("fence", "code_block"):
+            words += len(re.findall(r"\w+", token.content))
+        elif token.type == "heading_open":
+            text = inline_text(tokens[i + 1])
+            base = generate_slug(text) or "secao"
+            anchor, suffix = base, 1
+            while anchor in anchors:
+                suffix += 1
+                anchor = f"{base}-{suffix}"
+            anchors.add(anchor)
+            token.attrSet("id", anchor)
+            if token.tag in ("h2", "h3"):
+                toc.append({"level": int(token.tag[1]), "text": text, "anchor": anchor})
+    return {
+        "content_html": markdown.renderer.render(tokens, markdown.options, {}),
+        "toc": toc,
+        "word_count": words,
+        "reading_time": math.ceil(words / READING_WORDS_PER_MINUTE),
+        "render_version": BLOG_RENDER_VERSION,
+    }
 
-@api_router.get("/blog/{post_id}", response_model=BlogPost)
-async def get_blog_post(post_id: str):
+def blog_query(published_only: bool) -> dict:
+    return {"is_published": True} if published_only else {}
+
+BLOG_SUMMARY_PROJECTION = {"_id": 0, **{name: 1 for name in BlogPostSummary.model_fields}}
+
+async def load_blog_posts(published_only: bool, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE,
+                          full: bool = False) -> Union[List[BlogPostSummary], List[BlogPost]]:
+    if full:
+        return [BlogPost(**p) for p in await find_page(db.blog_posts, blog_query(published_only), cursor, limit)]
+    posts = await find_page(db.blog_posts, blog_query(published_only), cursor, limit, BLOG_SUMMARY_PROJECTION)
+    return [BlogPostSummary(**p) for p in posts]
+
+async def unique_slug(title: str, post_id: Optional[str] = None) -> str:
+    """Slug for title that no other post uses (blog_posts.slug is unique)"""
+    base = generate_slug(title) or "post"
+    slug, suffix = base, 1
+    while await db.blog_posts.find_one({"slug": slug, "id": {"$ne": post_id}}, {"_id": 1}):
+        suffix += 1
+        slug = f"{base}-{suffix}"
+    return slug
+
+@api_router.get("/blog", response_model=Union[List[BlogPostSummary], List[BlogPost]])
+async def get_blog_posts(
+    request: Request,
+    published_only: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    include_total: bool = False,
+    fields: str = Query("summary", pattern="^(summary|full)$")
+):
+    """Post cards without content by default; ?fields=full includes the article bodies"""
+    full = fields == "full"
+    key = f"blog:list:{'published' if published_only else 'all'}"
+    if full:
+        key += ":full"
+    if cursor or limit != DEFAULT_PAGE_SIZE:
+        # Only the first page is cached: callers can mint any number of cursors
+        posts = await load_blog_posts(published_only, cursor, limit, full)
+        entry = CachedResponse(posts, dump_json(posts), 0, key)
+    else:
+        entry = await cached(key, lambda: load_blog_posts(published_only, cursor, limit, full), CONTENT_CACHE_TTL)
+    headers = await page_headers(db.blog_posts, blog_query(published_only), entry.value, limit, include_total)
+    return json_response(entry, request, "blog", headers)
+
+def facet_counts(field: str) -> List[dict]:
+    return [
+        {"$match": {field: {"$nin": ["", None]}}},
+        {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$limit": SEARCH_MAX_FACETS},
+    ]
+
+async def search_blog_posts(q: str, category: str, tags: List[str], related_area_id: str,
+                            page: int, limit: int) -> BlogSearchResults:
+    """Published posts matching q and the filters, best matches first.
+
+    One aggregation returns the page, the total and the tag and category
+    counts. Facets count every match of q regardless of the filters, so
+    picking a tag or category doesn't hide its alternatives.
+    """
+    pipeline = [{"$match": {"is_published": True}}]
+    order = {"created_at": -1, "id": -1}
+    if q:
+        pipeline = [
+            {"$match": {"$text": {"$search": q}, "is_published": True}},
+            {"$addFields": {"score": {"$meta": "textScore"}}},
+        ]
+        order = {"score": -1, **order}
+    filters = {}
+    if category:
+        filters["category"] = category
+    if tags:
+        filters["tags"] = {"$all": tags}
+    if related_area_id:
+        filters["related_area_id"] = related_area_id
+
+    result = await db.blog_posts.aggregate(pipeline + [
+        {"$facet": {
+            "posts": [
+                {"$match": filters},
+                {"$sort": order},
+                {"$skip": (page - 1) * limit},
+                {"$limit": limit},
+                {"$project": BLOG_SUMMARY_PROJECTION},
+            ],
+            "total": [{"$match": filters}, {"$count": "count"}],
+            "tags": [{"$unwind": "$tags"}] + facet_counts("tags"),
+            "categories": facet_counts("category"),
+        }},
+    ]).to_list(1)
+    result = result[0]
+    return BlogSearchResults(
+        posts=[BlogPostSummary(**p) for p in result["posts"]],
+        total=result["total"][0]["count"] if result["total"] else 0,
+        page=page,
+        limit=limit,
+        tags=[SearchFacet(value=f["_id"], count=f["count"]) for f in result["tags"]],
+        categories=[SearchFacet(value=f["_id"], count=f["count"]) for f in result["categories"]],
+    )
+
+# Declared before /blog/{post_id} so "search" isn't taken for a post id
+@api_router.get("/blog/search", response_model=BlogSearchResults)
+async def search_blog(
+    q: str = Query("", max_length=200),
+    category: str = "",
+    tags: List[str] = Query([]),
+    related_area_id: str = "",
+    page: int = Query(1, ge=1, le=1000),
+    limit: int = Query(SEARCH_PAGE_SIZE, ge=1, le=100)
+):
+    return await search_blog_posts(q.strip(), category, tags, related_area_id, page, limit)
+
+async def load_blog_post(post_id: str) -> BlogPost:
     post = await db.blog_posts.find_one({"$or": [{"id": post_id}, {"slug": post_id}]}, {"_id": 0})
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
-    
-    if isinstance(post.get("created_at"), str):
-        post["created_at"] = datetime.fromisoformat(post["created_at"])
-    if isinstance(post.get("updated_at"), str):
-        post["updated_at"] = datetime.fromisoformat(post["updated_at"])
     return BlogPost(**post)
 
+@api_router.get("/blog/{post_id}", response_model=BlogPost)
+async def get_blog_post(post_id: str, request: Request):
+    entry = await cached(f"blog:post:{post_id}", lambda: load_blog_post(post_id), CONTENT_CACHE_TTL)
+    return json_response(entry, request, "blog_post")
+
 @api_router.post("/blog", response_model=BlogPost)
 async def create_blog_post(data: BlogPostCreate, user: dict = Depends(get_current_user)):
-    post = BlogPost(**data.model_dump())
-    post.slug = generate_slug(data.title)
+    rendered = render_blog_content(data.content)
+    post = BlogPost(**data.model_dump(), **rendered)
+    post.slug = await unique_slug(data.title, post.id)
     post.author_name = user.get("name", "Admin")
     
-    post_dict = post.model_dump()
-    post_dict["created_at"] = post_dict["created_at"].isoformat()
-    post_dict["updated_at"] = post_dict["updated_at"].isoformat()
-    
-    await db.blog_posts.insert_one(post_dict)
+    await db.blog_posts.insert_one({**post.model_dump(), "render_version": rendered["render_version"]})
+    await content_versions.bump("blog")
     return post
 
 @api_router.put("/blog/{post_id}", response_model=BlogPost)
@@ -564,17 +1703,14 @@ async def update_blog_post(post_id: str, data: BlogPostCreate, user: dict = Depe
     if not existing:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    update_data = data.model_dump()
-    update_data["slug"] = generate_slug(data.title)
-    update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    update_data = {**data.model_dump(), **render_blog_content(data.content)}
+    update_data["slug"] = await unique_slug(data.title, post_id)
+    update_data["updated_at"] = datetime.now(timezone.utc)
     
     await db.blog_posts.update_one({"id": post_id}, {"$set": update_data})
+    await content_versions.bump("blog")
     
     updated = await db.blog_posts.find_one({"id": post_id}, {"_id": 0})
-    if isinstance(updated.get("created_at"), str):
-        updated["created_at"] = datetime.fromisoformat(updated["created_at"])
-    if isinstance(updated.get("updated_at"), str):
-        updated["updated_at"] = datetime.fromisoformat(updated["updated_at"])
     return BlogPost(**updated)
 
 @api_router.delete("/blog/{post_id}")
@@ -582,35 +1718,535 @@ async def delete_blog_post(post_id: str, user: dict = Depends(get_current_user))
     result = await db.blog_posts.delete_one({"id": post_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Post not found")
+    await content_versions.bump("blog")
     return {"message": "Post deleted"}
 
+# ============ EMAIL NOTIFICATIONS ============
+
+async def lead_notifications(messages: List[dict]) -> List[dict]:
+    """Outbox rows announcing new leads, keyed so each lead is mailed once"""
+    if not SMTP_HOST:
+        for message in messages:
+            logger.info(f"New contact message from {message['email']}: {message['message'][:50]}...")
+        return []
+    recipient = LEAD_NOTIFICATION_EMAIL
+    if not recipient:
+        recipient = (await cached("settings", load_settings, SETTINGS_CACHE_TTL)).value.contact.email
+    now = datetime.now(timezone.utc)
+    return [{
+        "id": str(uuid.uuid4()),
+        "idempotency_key": f"new-lead:{message['id']}",
+        "to": recipient,
+        "reply_to": message["email"],
+        "subject": f"Novo contato: {message['name']}" + (f" ({message['company']})" if message.get("company") else ""),
+        "body": "\n".join([
+            f"Nome: {message['name']}",
+            f"Email: {message['email']}",
+            f"Telefone: {message.get('phone', '')}",
+            f"Empresa: {message.get('company', '')}",
+            f"Área de interesse: {message.get('area_of_interest', '')}",
+            "",
+            message["message"],
+        ]),
+        "status": "pending",
+        "attempts": 0,
+        "next_attempt_at": now,
+        "created_at": now,
+    } for message in messages]
+
+def send_email(job: dict):
+    email = EmailMessage()
+    email["From"] = EMAIL_FROM
+    email["To"] = job["to"]
+    email["Reply-To"] = job["reply_to"]
+    email["Subject"] = job["subject"]
+    # Stable Message-ID lets mail servers drop a duplicate if a retry races a slow success
+    email["Message-ID"] = f"<{hashlib.sha256(job['idempotency_key'].encode()).hexdigest()[:32]}@startrade>"
+    email.set_content(job["body"])
+    with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=EMAIL_SEND_TIMEOUT) as smtp:
+        if SMTP_STARTTLS:
+            smtp.starttls()
+        if SMTP_USERNAME:
+            smtp.login(SMTP_USERNAME, SMTP_PASSWORD)
+        smtp.send_message(email)
+
+class EmailOutboxWorker:
+    """Delivers email_outbox rows in the background, off the request path.
+
+    Rows are claimed with an atomic status flip plus a lease, so several
+    workers can share the outbox and a row abandoned by a crashed worker is
+    picked up again once its lease runs out. Failures are retried with
+    exponential backoff up to EMAIL_MAX_ATTEMPTS.
+    """
+
+    def __init__(self, concurrency: int, poll_interval: float):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self._slots = asyncio.Semaphore(concurrency)
+        self._inflight: set = set()
+        self._task: Optional[asyncio.Task] = None
+
+    async def _claim(self) -> Optional[dict]:
+        now = datetime.now(timezone.utc)
+        return await db.email_outbox.find_one_and_update(
+            {"$or": [
+                {"status": "pending", "next_attempt_at": {"$lte": now}},
+                {"status": "sending", "locked_until": {"$lte": now}},
+            ]},
+            {"$set": {"status": "sending", "locked_until": now + timedelta(seconds=EMAIL_SEND_TIMEOUT * 2)}},
+            projection={"_id": 0},
+            sort=[("next_attempt_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _deliver(self, job: dict):
+        try:
+            await asyncio.wait_for(asyncio.to_thread(send_email, job), EMAIL_SEND_TIMEOUT)
+        except Exception as e:
+            attempts = job["attempts"] + 1
+            update = {"attempts": attempts, "last_error": str(e)[:500]}
+            if attempts >= EMAIL_MAX_ATTEMPTS:
+                self.failed += 1
+                update["status"] = "failed"
+                logger.error(f"Giving up on email {job['idempotency_key']} after {attempts} attempts: {e}")
+            else:
+                self.retried += 1
+                update["status"] = "pending"
+                update["next_attempt_at"] = datetime.now(timezone.utc) + timedelta(seconds=min(2 ** attempts * 5, 3600))
+            await db.email_outbox.update_one({"id": job["id"]}, {"$set": update})
+        else:
+            self.sent += 1
+            await db.email_outbox.update_one(
+                {"id": job["id"]},
+                {"$set": {"status": "sent", "sent_at": datetime.now(timezone.utc)}}
+            )
+        finally:
+            self._slots.release()
+
+    async def _run(self):
+        while True:
+            await self._slots.acquire()
+            try:
+                job = await self._claim()
+            except Exception:
+                logger.exception("Failed to claim from email_outbox")
+                job = None
+            if job is None:
+                self._slots.release()
+                await asyncio.sleep(self.poll_interval)
+                continue
+            task = asyncio.create_task(self._deliver(job))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    def start(self):
+        if SMTP_HOST and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        # Unfinished sends are retried by whichever worker claims them after the lease
+        if self._inflight:
+            await asyncio.wait(self._inflight, timeout=5)
+
+    def metrics(self) -> dict:
+        return {
+            "enabled": bool(SMTP_HOST),
+            "in_flight": len(self._inflight),
+            "concurrency": self.concurrency,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+email_worker = EmailOutboxWorker(EMAIL_CONCURRENCY, EMAIL_POLL_INTERVAL)
+
 # ============ CONTACT MESSAGES ROUTES ============
 
+async def insert_many_idempotent(collection, docs: List[dict]):
+    """insert_many that treats duplicate keys as already written"""
+    try:
+        await collection.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+            raise
+
+class ContactIngestQueue:
+    """Write-behind buffer between POST /api/contact and contact_messages.
+
+    Submissions are acknowledged as soon as they are queued. A single task
+    writes them with insert_many once CONTACT_BATCH_SIZE messages are
+    waiting or CONTACT_FLUSH_INTERVAL seconds have passed. A full queue
+    rejects new submissions with 503 rather than growing without bound, and
+    stop() writes out everything still buffered.
+    """
+
+    def __init__(self, max_size: int, batch_size: int, flush_interval: float):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.accepted = 0
+        self.written = 0
+        self.rejected = 0
+        self.failed = 0
+        self.batches = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self._batch: List[dict] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        # Also revives a task that died; _run picks up the batch it was holding
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def submit(self, doc: dict):
+        self.start()
+        try:
+            self._queue.put_nowait(doc)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many submissions, try again shortly",
+                headers={"Retry-After": "5"}
+            )
+        self.accepted += 1
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    if not self._batch:
+                        self._batch.append(await self._queue.get())
+                    deadline = loop.time() + self.flush_interval
+                    while len(self._batch) < self.batch_size:
+                        timeout = deadline - loop.time()
+                        if timeout <= 0:
+                            break
+                        try:
+                            self._batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                        except asyncio.TimeoutError:
+                            break
+                    await self._flush(self._batch)
+                    self._batch = []
+                except Exception:
+                    # Keep the batch and the task; a dead task would strand the queue
+                    logger.exception("Contact ingest loop failed, retrying")
+                    await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            # stop() flushes whatever is left in self._batch and the queue
+            pass
+
+    async def _flush(self, batch: List[dict]):
+        for attempt in range(CONTACT_FLUSH_RETRIES):
+            try:
+                # May look up the recipient in settings, so it is retried too
+                outbox = await lead_notifications(batch)
+                # Both writes tolerate rows left by an earlier attempt, so the
+                # outbox always ends up matching the stored messages
+                await insert_many_idempotent(db.contact_messages, batch)
+                if outbox:
+                    await insert_many_idempotent(db.email_outbox, outbox)
+                await content_versions.bump("messages")
+                break
+            except Exception as e:
+                logger.warning(f"Contact batch write failed (attempt {attempt + 1}): {e}")
+            await asyncio.sleep(min(2 ** attempt, 30))
+        else:
+            self.failed += len(batch)
+            logger.error(f"Dropping {len(batch)} contact messages after retries: "
+                         f"{[doc.get('id') for doc in batch]}")
+            return
+        self.written += len(batch)
+        self.batches += 1
+        logger.info(f"Stored {len(batch)} contact message(s)")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        pending = self._batch + [self._queue.get_nowait() for _ in range(self._queue.qsize())]
+        self._batch = []
+        for start in range(0, len(pending), self.batch_size):
+            await self._flush(pending[start:start + self.batch_size])
+
+    def metrics(self) -> dict:
+        return {
+            "queued": self._queue.qsize() + len(self._batch),
+            "max_size": self.max_size,
+            "accepted": self.accepted,
+            "written": self.written,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+contact_queue = ContactIngestQueue(CONTACT_QUEUE_MAX_SIZE, CONTACT_BATCH_SIZE, CONTACT_FLUSH_INTERVAL)
+
+class MessageEvents:
+    """Pushes new messages and unread-count changes to admin event streams.
+
+    Every write to contact_messages bumps the "messages" content version, so
+    each worker hears about it (at once for its own writes, within
+    CONTENT_VERSION_POLL_INTERVAL for others) and reads the changes once for
+    all of its subscribers. Messages are matched against recently announced
+    ids rather than a timestamp cursor because batches from different workers
+    can land out of created_at order.
+    """
+
+    # How far back to look for messages still being flushed by other workers
+    LOOKBACK = timedelta(minutes=1)
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: set = set()
+        self._announced: "OrderedDict[str, datetime]" = OrderedDict()
+        self._unread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._dirty = False
+
+    async def subscribe(self) -> asyncio.Queue:
+        if not self._subscribers:
+            # Nothing was tracked while nobody listened; start from what is stored now
+            latest = await db.contact_messages.find({}, {"_id": 0, "id": 1, "created_at": 1}) \
+                .sort(PAGE_SORT).limit(1).to_list(1)
+            self._announced = OrderedDict((m["id"], m["created_at"]) for m in latest)
+            self._unread = await db.contact_messages.count_documents({"is_read": False})
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        queue.put_nowait(("unread", {"unread": self._unread}))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def is_subscribed(self, queue: asyncio.Queue) -> bool:
+        return queue in self._subscribers
+
+    def changed(self):
+        if not self._subscribers:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._publish())
+        else:
+            # Coalesce bursts into one more read after the current one
+            self._dirty = True
+
+    async def _publish(self):
+        self._dirty = True
+        while self._dirty:
+            self._dirty = False
+            try:
+                await self._read_changes()
+            except Exception:
+                logger.exception("Failed to read contact message changes")
+
+    async def _read_changes(self):
+        horizon = max(self._announced.values(), default=datetime.now(timezone.utc)) - self.LOOKBACK
+        recent = await db.contact_messages.find({"created_at": {"$gte": horizon}}, {"_id": 0}) \
+            .sort([("created_at", ASCENDING), ("id", ASCENDING)]).to_list(None)
+        for message in recent:
+            if message["id"] not in self._announced:
+                self._announced[message["id"]] = message["created_at"]
+                self._broadcast("message", ContactMessage(**message).model_dump(mode="json"))
+        while len(self._announced) > 1 and next(iter(self._announced.values())) < horizon:
+            self._announced.popitem(last=False)
+        unread = await db.contact_messages.count_documents({"is_read": False})
+        if unread != self._unread:
+            self._unread = unread
+            self._broadcast("unread", {"unread": unread})
+
+    def _broadcast(self, event: str, data: dict):
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait((event, data))
+            except asyncio.QueueFull:
+                # A client this far behind gets dropped; EventSource reconnects and resyncs
+                self._subscribers.discard(queue)
+
+    def close(self):
+        """End every open stream so shutdown doesn't wait on idle connections"""
+        for queue in self._subscribers:
+            while queue.full():
+                queue.get_nowait()
+            queue.put_nowait(None)
+        self._subscribers.clear()
+
+message_events = MessageEvents(SSE_QUEUE_SIZE)
+
+def sse_event(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
 @api_router.post("/contact", response_model=ContactMessage)
-async def create_contact_message(data: ContactMessageCreate):
+async def create_contact_message(data: ContactMessageCreate, request: Request):
+    await rate_limiter.check("contact", ip=client_ip(request), email=data.email.lower())
     message = ContactMessage(**data.model_dump())
-    message_dict = message.model_dump()
-    message_dict["created_at"] = message_dict["created_at"].isoformat()
-    
-    await db.contact_messages.insert_one(message_dict)
-    # Mock email sending - in production, integrate with SendGrid/Resend
-    logging.info(f"New contact message from {data.email}: {data.message[:50]}...")
+    contact_queue.submit(message.model_dump())
     return message
 
 @api_router.get("/messages", response_model=List[ContactMessage])
-async def get_contact_messages(user: dict = Depends(get_current_user)):
-    messages = await db.contact_messages.find({}, {"_id": 0}).sort("created_at", -1).to_list(1000)
+async def get_contact_messages(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    include_total: bool = False,
+    user: dict = Depends(get_current_user)
+):
+    messages = [ContactMessage(**m) for m in await find_page(db.contact_messages, {}, cursor, limit)]
+    response.headers.update(await page_headers(db.contact_messages, {}, messages, limit, include_total))
+    return messages
+
+@api_router.post("/messages/stream-token")
+async def issue_stream_token(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user: dict = Depends(get_current_user)
+):
+    return {"token": create_stream_token(credentials.credentials), "expires_in": STREAM_TOKEN_SECONDS}
+
+async def check_stream_session(claims: dict):
+    """The stream outlives its token, so keep checking the session behind it"""
+    if claims["session_exp"] <= time.time():
+        raise HTTPException(status_code=401, detail="Token expired")
+    if await db.revoked_tokens.find_one({"token_hash": claims["sid"]}, {"_id": 1}):
+        raise HTTPException(status_code=401, detail="Token revoked")
+    if auth_cache.user(claims["user_id"]) is None:
+        user = await db.users.find_one({"id": claims["user_id"]}, {"_id": 0, "password": 0})
+        if not user:
+            raise HTTPException(status_code=401, detail="User not found")
+        auth_cache.remember_user(claims["user_id"], user)
+
+@api_router.get("/messages/stream")
+async def stream_message_events(request: Request, token: str):
+    """Server-sent events: "message" for each new lead, "unread" when the count changes.
+
+    Takes only a token from POST /messages/stream-token; session JWTs are
+    refused here so they never appear in URLs.
+    """
+    try:
+        claims = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token expired")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    if claims.get("purpose") != "stream":
+        raise HTTPException(status_code=401, detail="Invalid token")
+    await check_stream_session(claims)
+    queue = await message_events.subscribe()
+
+    async def events():
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), SSE_HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    if not message_events.is_subscribed(queue) or await request.is_disconnected():
+                        break
+                    try:
+                        # Logged-out or expired sessions lose the stream too
+                        await check_stream_session(claims)
+                    except HTTPException:
+                        break
+                    yield b": keep-alive\n\n"
+                    continue
+                if item is None:
+                    break
+                yield sse_event(*item)
+        finally:
+            message_events.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+EXPORT_FIELDS = ["id", "created_at", "name", "email", "phone", "company", "area_of_interest", "message", "is_read"]
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+def as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def export_row(doc: dict) -> dict:
+    row = {field: doc.get(field, "") for field in EXPORT_FIELDS}
+    if isinstance(row["created_at"], datetime):
+        row["created_at"] = as_utc(row["created_at"]).isoformat()
+    return row
+
+# Leading characters that make spreadsheets evaluate a cell as a formula
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+# "+55 (11) 99999-9999" starts with + but can't hold a formula; keep phones intact
+PHONE_NUMBER = re.compile(r"[+\-\d\s()]+")
+
+def csv_cell(value):
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES) and not PHONE_NUMBER.fullmatch(value):
+        return f"'{value}"
+    return value
+
+def csv_safe(row: dict) -> dict:
+    """Quote form input that a spreadsheet would run as a formula (CSV injection)"""
+    return {field: csv_cell(value) for field, value in row.items()}
+
+async def stream_export(cursor, export_format: str):
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        async for doc in cursor:
+            writer.writerow(csv_safe(export_row(doc)))
+            if buffer.tell() >= 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    else:
+        async for doc in cursor:
+            yield json.dumps(export_row(doc), ensure_ascii=False) + "\n"
+
+@api_router.get("/messages/export")
+async def export_contact_messages(
+    format: str = "ndjson",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    is_read: Optional[bool] = None,
+    user: dict = Depends(get_current_user)
+):
+    """Stream every matching lead straight from the cursor as NDJSON or CSV"""
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="Unsupported format, use ndjson or csv")
+    query = {}
+    if start or end:
+        query["created_at"] = {}
+        if start:
+            query["created_at"]["$gte"] = as_utc(start)
+        if end:
+            query["created_at"]["$lt"] = as_utc(end)
+    if is_read is not None:
+        query["is_read"] = is_read
     
-    for msg in messages:
-        if isinstance(msg.get("created_at"), str):
-            msg["created_at"] = datetime.fromisoformat(msg["created_at"])
-    return [ContactMessage(**m) for m in messages]
+    cursor = db.contact_messages.find(query, {"_id": 0}) \
+        .sort([("created_at", ASCENDING), ("id", ASCENDING)]).batch_size(EXPORT_BATCH_SIZE)
+    filename = f"contact-messages-{datetime.now(timezone.utc):%Y%m%d}.{format}"
+    return StreamingResponse(
+        stream_export(cursor, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 @api_router.put("/messages/{message_id}/read")
 async def mark_message_read(message_id: str, user: dict = Depends(get_current_user)):
     result = await db.contact_messages.update_one({"id": message_id}, {"$set": {"is_read": True}})
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Message not found")
+    await content_versions.bump("messages")
     return {"message": "Marked as read"}
 
 @api_router.delete("/messages/{message_id}")
@@ -618,67 +2254,761 @@ async def delete_message(message_id: str, user: dict = Depends(get_current_user)
     result = await db.contact_messages.delete_one({"id": message_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Message not found")
+    await content_versions.bump("messages")
     return {"message": "Message deleted"}
 
+# ============ MEDIA STORAGE ============
+
+class SpooledUpload:
+    """An upload copied to a local temp file, with size and SHA-256"""
+
+    def __init__(self, path: Path, size: int, checksum: str):
+        self.path = path
+        self.size = size
+        self.checksum = checksum
+
+    def discard(self):
+        self.path.unlink(missing_ok=True)
+
+async def spool_upload(file: UploadFile, directory: Path) -> SpooledUpload:
+    """Copy an upload to disk in fixed-size chunks, hashing it on the way"""
+    directory.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_name = tempfile.mkstemp(dir=directory, suffix=".part")
+    path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await file.read(MEDIA_CHUNK_SIZE):
+                size += len(chunk)
+                if size > MAX_UPLOAD_SIZE:
+                    raise HTTPException(status_code=413, detail="File too large")
+                digest.update(chunk)
+                await asyncio.to_thread(out.write, chunk)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return SpooledUpload(path, size, digest.hexdigest())
+
+class MediaStorage(ABC):
+    """Where uploaded bytes live. Keys are relative, slash-separated paths."""
+
+    # Local directory for partially received uploads
+    spool_dir: Path = MEDIA_ROOT / ".incoming"
+
+    @abstractmethod
+    async def put(self, upload: SpooledUpload, key: str, content_type: str):
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str):
+        ...
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        ...
+
+    @abstractmethod
+    def local_file(self, key: str) -> AbstractAsyncContextManager[Path]:
+        """Context manager yielding a local path holding the object's bytes"""
+        ...
+
+class FileSystemStorage(MediaStorage):
+    def __init__(self, root: Path, public_url: str):
+        self.root = root
+        self.public_url = public_url
+        self.spool_dir = root / ".incoming"
+
+    def path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise HTTPException(status_code=400, detail="Invalid storage key")
+        return path
+
+    async def put(self, upload: SpooledUpload, key: str, content_type: str):
+        target = self.path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Same filesystem as the spool directory, so this is an atomic rename
+        os.replace(upload.path, target)
+
+    async def delete(self, key: str):
+        self.path(key).unlink(missing_ok=True)
+
+    def url(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+    @asynccontextmanager
+    async def local_file(self, key: str):
+        yield self.path(key)
+
+class S3Storage(MediaStorage):
+    """S3-compatible bucket (AWS, MinIO). Credentials come from the usual AWS env vars."""
+
+    def __init__(self, bucket: str, endpoint_url: Optional[str], public_url: str):
+        import boto3
+        self.bucket = bucket
+        self.public_url = public_url or f"{(endpoint_url or 'https://s3.amazonaws.com').rstrip('/')}/{bucket}"
+        self._client = boto3.client("s3", endpoint_url=endpoint_url)
+
+    async def put(self, upload: SpooledUpload, key: str, content_type: str):
+        # upload_file switches to multipart uploads for large files
+        await asyncio.to_thread(
+            self._client.upload_file, str(upload.path), self.bucket, key,
+            ExtraArgs={"ContentType": content_type}
+        )
+
+    async def delete(self, key: str):
+        await asyncio.to_thread(self._client.delete_object, Bucket=self.bucket, Key=key)
+
+    def url(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+    @asynccontextmanager
+    async def local_file(self, key: str):
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.spool_dir)
+        os.close(fd)
+        try:
+            await asyncio.to_thread(self._client.download_file, self.bucket, key, tmp_name)
+            yield Path(tmp_name)
+        finally:
+            Path(tmp_name).unlink(missing_ok=True)
+
+def create_media_storage() -> MediaStorage:
+    if MEDIA_STORAGE == "s3":
+        return S3Storage(S3_BUCKET, S3_ENDPOINT_URL, S3_PUBLIC_URL)
+    return FileSystemStorage(MEDIA_ROOT, MEDIA_PUBLIC_URL)
+
+media_storage = create_media_storage()
+
+def content_key(checksum: str, extension: str) -> str:
+    """Content-addressed storage key; identical bytes always map to one blob"""
+    return f"{checksum[:2]}/{checksum}{extension}"
+
+def safe_folder(folder: str) -> str:
+    return re.sub(r"[^\w-]", "", folder) or "general"
+
+def media_extension(filename: str, content_type: str) -> str:
+    suffix = Path(filename or "").suffix.lower()
+    if re.fullmatch(r"\.[a-z0-9]{1,8}", suffix):
+        return suffix
+    return mimetypes.guess_extension(content_type) or ""
+
+# ============ IMAGE DERIVATIVES ============
+
+IMAGE_VARIANT_TYPES = {"image/jpeg", "image/png", "image/webp"}
+
+def render_image_variants(source: str, out_dir: str, widths: List[int], formats: List[str], quality: int) -> dict:
+    """Resize one image into every width/format pair. Runs in a worker process."""
+    from PIL import Image, ImageOps
+    
+    rendered = []
+    with Image.open(source) as original:
+        # A WebP upload makes "source" and "webp" the same format; render it once
+        resolved = list(dict.fromkeys((original.format if fmt == "source" else fmt).upper() for fmt in formats))
+        image = ImageOps.exif_transpose(original)
+        for width in sorted(set(widths)):
+            if width >= image.width:
+                continue
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+            for fmt in resolved:
+                frame = resized
+                if fmt == "JPEG" and frame.mode not in ("RGB", "L"):
+                    frame = frame.convert("RGB")
+                fd, path = tempfile.mkstemp(dir=out_dir, suffix=f".{fmt.lower()}")
+                with os.fdopen(fd, "wb") as out:
+                    frame.save(out, format=fmt, quality=quality, optimize=True)
+                rendered.append({"width": width, "height": height, "format": fmt.lower(), "path": path})
+        return {"width": image.width, "height": image.height, "variants": rendered}
+
+class ImagePipeline:
+    """Builds resized/WebP derivatives of uploaded images off the event loop"""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def formats(self) -> List[str]:
+        from PIL import features
+        return [f for f in IMAGE_VARIANT_FORMATS if f != "avif" or features.check("avif")]
+
+    async def process(self, media: MediaFile):
+        if self._pool is None:
+            # Forking this process (Motor, bcrypt and to_thread threads) can
+            # deadlock the child, so workers start from a clean forkserver
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("forkserver")
+            )
+        spool_dir = media_storage.spool_dir
+        spool_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            async with media_storage.local_file(media.storage_key) as source:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self._pool, render_image_variants,
+                    str(source), str(spool_dir), IMAGE_VARIANT_WIDTHS, self.formats(), IMAGE_VARIANT_QUALITY
+                )
+        except Exception:
+            logger.exception(f"Could not render variants for media {media.id}")
+            return
+        
+        variants = []
+        for item in result["variants"]:
+            path = Path(item.pop("path"))
+            fmt = item["format"]
+            key = f"{media.checksum[:2]}/{media.checksum}/w{item['width']}.{fmt}"
+            upload = SpooledUpload(path, path.stat().st_size, "")
+            try:
+                await media_storage.put(upload, key, mimetypes.types_map.get(f".{fmt}", f"image/{fmt}"))
+            finally:
+                upload.discard()
+            variants.append(ImageVariant(**item, url=media_storage.url(key), size=upload.size, storage_key=key))
+        
+        # Every upload of these bytes shares the derivatives
+        await db.media.update_many({"checksum": media.checksum}, {"$set": {
+            "width": result["width"],
+            "height": result["height"],
+            "variants": [v.model_dump() for v in variants],
+        }})
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+image_pipeline = ImagePipeline(IMAGE_WORKERS)
+
+# ============ MEDIA SERVING ============
+
+# <sha256[:2]>/<sha256>.<ext> originals and <sha256[:2]>/<sha256>/w<width>.<ext> derivatives
+CONTENT_HASHED_KEY = re.compile(r"[0-9a-f]{2}/(?P<checksum>[0-9a-f]{64})(/w\d+)?\.[a-z0-9]+")
+
+def parse_byte_range(header: str, size: int) -> Optional[tuple]:
+    """Inclusive (start, end) for a single-range header, None to send the whole file"""
+    unit, _, ranges = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        # Multipart ranges are optional (RFC 9110 14.2); fall back to 200
+        return None
+    start_text, _, end_text = (part.strip() for part in ranges.strip().partition("-"))
+    if not (start_text or end_text) or not all(text.isdigit() for text in (start_text, end_text) if text):
+        return None
+    if start_text:
+        start = int(start_text)
+        end = int(end_text) if end_text else max(size - 1, start)
+        if end < start:
+            # Invalid rather than unsatisfiable: ignore it and send the whole file
+            return None
+    else:
+        start, end = size - int(end_text), size - 1
+    if start >= size:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return max(start, 0), min(end, size - 1)
+
+def iter_mapped_range(path: Path, start: int, end: int):
+    """Yield a byte range straight from a read-only memory map"""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        position = start
+        while position <= end:
+            stop = min(position + MEDIA_RANGE_CHUNK_SIZE, end + 1)
+            yield mapped[position:stop]
+            position = stop
+
+def media_headers(key: str, stat_result: os.stat_result) -> dict:
+    match = CONTENT_HASHED_KEY.fullmatch(key)
+    if match:
+        etag = f'"{match.group("checksum")}{key.rsplit("/", 1)[-1] if "/w" in key else ""}"'
+        cache_control = CACHE_CONTROL_MEDIA_IMMUTABLE
+    else:
+        etag = f'"{int(stat_result.st_mtime)}-{stat_result.st_size}"'
+        cache_control = CACHE_CONTROL_MEDIA
+    return {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+        "Last-Modified": format_datetime(datetime.fromtimestamp(int(stat_result.st_mtime), timezone.utc), usegmt=True),
+    }
+
 # ============ MEDIA ROUTES ============
 
 @api_router.get("/media", response_model=List[MediaFile])
-async def get_media_files(folder: str = None, user: dict = Depends(get_current_user)):
+async def get_media_files(
+    response: Response,
+    folder: str = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    include_total: bool = False,
+    user: dict = Depends(get_current_user)
+):
     query = {"folder": folder} if folder else {}
-    files = await db.media.find(query, {"_id": 0}).sort("created_at", -1).to_list(1000)
-    
-    for f in files:
-        if isinstance(f.get("created_at"), str):
-            f["created_at"] = datetime.fromisoformat(f["created_at"])
-    return [MediaFile(**f) for f in files]
+    files = [MediaFile(**f) for f in await find_page(db.media, query, cursor, limit)]
+    response.headers.update(await page_headers(db.media, query, files, limit, include_total))
+    return files
+
+class MediaBlobs:
+    """Reference counts for stored files, one media_blobs row per checksum.
+
+    Every library entry with the same bytes points at one stored file. The
+    write of a new file and the delete of an unreferenced one both happen
+    under a lease on the checksum's row, so an upload can never lose its
+    bytes to a concurrent delete of the last other entry.
+    """
+
+    async def acquire(self, checksum: str, storage_key: str) -> dict:
+        """Lease the checksum's row, creating it unreferenced if needed"""
+        token = str(uuid.uuid4())
+        while True:
+            now = datetime.now(timezone.utc)
+            try:
+                blob = await db.media_blobs.find_one_and_update(
+                    {"checksum": checksum, "$or": [{"lease_until": None}, {"lease_until": {"$lt": now}}]},
+                    {
+                        "$set": {"lease": token, "lease_until": now + timedelta(seconds=MEDIA_BLOB_LEASE)},
+                        "$setOnInsert": {"storage_key": storage_key, "ref_count": 0, "stored": False},
+                    },
+                    projection={"_id": 0},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+                return blob
+            except DuplicateKeyError:
+                # Leased by another request: the upsert tried to insert a second row
+                await asyncio.sleep(0.05)
+
+    async def release(self, blob: dict, ref_delta: int = 0, stored: Optional[bool] = None):
+        update = {"$set": {"lease_until": None}}
+        if ref_delta:
+            update["$inc"] = {"ref_count": ref_delta}
+        if stored is not None:
+            update["$set"]["stored"] = stored
+        await db.media_blobs.update_one({"checksum": blob["checksum"], "lease": blob["lease"]}, update)
+
+    async def remove(self, blob: dict):
+        await db.media_blobs.delete_one({"checksum": blob["checksum"], "lease": blob["lease"]})
+
+media_blobs = MediaBlobs()
 
 @api_router.post("/media/upload")
-async def upload_media(file: UploadFile = File(...), folder: str = "general", user: dict = Depends(get_current_user)):
-    # Mock upload - in production, use Cloudinary/S3
-    content = await file.read()
-    file_id = str(uuid.uuid4())
-    
-    # For demo, create a data URL (in production, upload to CDN)
+async def upload_media(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    folder: str = "general",
+    compress: bool = Form(True),
+    user: dict = Depends(get_current_user)
+):
+    """Add a library entry; identical bytes are stored once and shared between entries"""
     content_type = file.content_type or "application/octet-stream"
-    b64 = base64.b64encode(content).decode()
-    mock_url = f"data:{content_type};base64,{b64[:100]}..."  # Truncated for storage
+    upload = await spool_upload(file, media_storage.spool_dir)
+    try:
+        blob = await media_blobs.acquire(
+            upload.checksum, content_key(upload.checksum, media_extension(file.filename, content_type))
+        )
+        try:
+            shared = {"url": media_storage.url(blob["storage_key"]), "storage_key": blob["storage_key"]}
+            if blob["stored"]:
+                # Same bytes are already stored; reuse them and their derivatives
+                existing = await db.media.find_one({"checksum": upload.checksum}, {"_id": 0})
+                shared.update({field: existing[field] for field in ("width", "height", "variants")
+                               if existing and field in existing})
+            else:
+                await media_storage.put(upload, blob["storage_key"], content_type)
+            media_file = MediaFile(
+                filename=file.filename,
+                file_type=content_type,
+                size=upload.size,
+                checksum=upload.checksum,
+                folder=safe_folder(folder),
+                **shared
+            )
+            await db.media.insert_one(media_file.model_dump())
+        except BaseException:
+            await media_blobs.release(blob)
+            raise
+        await media_blobs.release(blob, ref_delta=1, stored=True)
+    finally:
+        upload.discard()
     
-    media_file = MediaFile(
-        id=file_id,
-        filename=file.filename,
-        url=mock_url,
-        file_type=content_type,
-        size=len(content),
-        folder=folder
-    )
+    if compress and content_type in IMAGE_VARIANT_TYPES and not media_file.variants:
+        background_tasks.add_task(image_pipeline.process, media_file)
+    return {"message": "File uploaded", "file": media_file}
+
+@api_router.api_route("/media/files/{key:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def serve_media_file(key: str, request: Request):
+    """Serve stored media with Range support and long-lived caching for hashed keys"""
+    if not isinstance(media_storage, FileSystemStorage):
+        raise HTTPException(status_code=404, detail="File not found")
+    path = media_storage.path(key)
+    try:
+        stat_result = path.stat()
+    except (FileNotFoundError, NotADirectoryError):
+        raise HTTPException(status_code=404, detail="File not found")
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="File not found")
     
-    media_dict = media_file.model_dump()
-    media_dict["created_at"] = media_dict["created_at"].isoformat()
-    await db.media.insert_one(media_dict)
+    headers = media_headers(key, stat_result)
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
     
-    return {"message": "File uploaded", "file": media_file}
+    if MEDIA_ACCEL_REDIRECT:
+        # nginx serves the file (Range included) with sendfile; no bytes pass through Python
+        headers["X-Accel-Redirect"] = f"{MEDIA_ACCEL_REDIRECT}/{key}"
+        return Response(media_type=content_type, headers=headers)
+    
+    size = stat_result.st_size
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and size and (if_range is None or if_range == headers["ETag"]):
+        byte_range = parse_byte_range(range_header, size)
+    if byte_range is None:
+        return FileResponse(path, media_type=content_type, headers=headers)
+    
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    if request.method == "HEAD":
+        return Response(status_code=status.HTTP_206_PARTIAL_CONTENT, media_type=content_type, headers=headers)
+    return StreamingResponse(
+        iter_mapped_range(path, start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=content_type,
+        headers=headers
+    )
 
 @api_router.delete("/media/{file_id}")
 async def delete_media(file_id: str, user: dict = Depends(get_current_user)):
-    result = await db.media.delete_one({"id": file_id})
-    if result.deleted_count == 0:
+    media = await db.media.find_one_and_delete(
+        {"id": file_id},
+        projection={"_id": 0, "checksum": 1, "storage_key": 1, "variants": 1}
+    )
+    if media is None:
         raise HTTPException(status_code=404, detail="File not found")
+    keys = [media.get("storage_key")] + [v.get("storage_key") for v in media.get("variants", [])]
+    if not media.get("checksum"):
+        # Uploaded before checksums existed, so nothing else shares its file
+        for key in filter(None, keys):
+            await media_storage.delete(key)
+        return {"message": "File deleted"}
+    
+    # The stored file and its derivatives go with the last entry that shares them
+    blob = await media_blobs.acquire(media["checksum"], media.get("storage_key", ""))
+    try:
+        if blob["ref_count"] > 1:
+            await media_blobs.release(blob, ref_delta=-1)
+            return {"message": "File deleted"}
+        for key in filter(None, keys):
+            await media_storage.delete(key)
+    except BaseException:
+        # Some files may be gone; the next upload of these bytes writes them again
+        await media_blobs.release(blob, ref_delta=-1, stored=False)
+        raise
+    await media_blobs.remove(blob)
     return {"message": "File deleted"}
 
+# ============ LANDING ROUTES ============
+
+LANDING_BLOG_POSTS = 3
+
+async def load_landing() -> LandingPayload:
+    settings_entry, areas_entry, posts_entry = await asyncio.gather(
+        cached("settings", load_settings, SETTINGS_CACHE_TTL),
+        cached("areas", load_areas, CONTENT_CACHE_TTL),
+        cached("blog:list:published", lambda: load_blog_posts(True), CONTENT_CACHE_TTL),
+    )
+    settings = settings_entry.value
+    posts = posts_entry.value[:LANDING_BLOG_POSTS]
+    return LandingPayload(
+        settings=settings,
+        areas=[a for a in areas_entry.value if a.is_active],
+        blog_posts=posts
+    )
+
+def project_landing(payload: LandingPayload, lang: str) -> dict:
+    fallback = payload.settings.default_language
+    data = payload.model_dump(mode="json")
+    data["settings"] = project_settings(payload.settings, lang, fallback)
+    data["areas"] = project_areas(payload.areas, lang, fallback)
+    return data
+
+@api_router.get("/landing", response_model=LandingPayload)
+async def get_landing(request: Request, lang: Optional[str] = None):
+    """Settings, active areas and latest published posts in one payload"""
+    lang = resolve_language(lang)
+    key = f"landing:{lang or 'all'}"
+    entry = response_cache.get(key)
+    if entry is None:
+        generation = response_cache.generation
+        payload = await load_landing()
+        body = dump_projected_json(project_landing(payload, lang)) if lang else None
+        entry = response_cache.set(key, payload, min(SETTINGS_CACHE_TTL, CONTENT_CACHE_TTL), body=body,
+                                   generation=generation)
+    return json_response(entry, request, "landing")
+
+# ============ SITEMAP & FEEDS ============
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+SITEMAP_NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+XHTML_NS = 'xmlns:xhtml="http://www.w3.org/1999/xhtml"'
+SITEMAP_FIELDS = {"_id": 0, "slug": 1, "updated_at": 1}
+FEED_FIELDS = {**BLOG_SUMMARY_PROJECTION, "content_html": 1}
+# Oldest first, so a new post only changes the last sitemap file
+SITEMAP_SORT = [("created_at", ASCENDING), ("id", ASCENDING)]
+# The landing page and the blog index lead the first file
+SITEMAP_PAGES = 2
+
+def site_url() -> str:
+    if not SITE_URL:
+        raise HTTPException(status_code=404, detail="Sitemap and feeds are disabled until SITE_URL is set")
+    return SITE_URL
+
+def w3c_datetime(value: datetime) -> str:
+    return as_utc(value).replace(microsecond=0).isoformat()
+
+def newest(*stamps: Optional[datetime]) -> Optional[datetime]:
+    stamps = [as_utc(ts) for ts in stamps if ts]
+    return max(stamps) if stamps else None
+
+def sitemap_url(loc: str, lastmod: Optional[datetime], alternates: bool = False) -> str:
+    """<url> entry; alternates links the ?lang= version of the page for each language"""
+    parts = [f"<url><loc>{xml_escape(loc)}</loc>"]
+    if lastmod:
+        parts.append(f"<lastmod>{w3c_datetime(lastmod)}</lastmod>")
+    if alternates:
+        for lang in LANGUAGES:
+            parts.append(f'<xhtml:link rel="alternate" hreflang="{lang}" href={quoteattr(f"{loc}?lang={lang}")}/>')
+        parts.append(f'<xhtml:link rel="alternate" hreflang="x-default" href={quoteattr(loc)}/>')
+    parts.append("</url>")
+    return "".join(parts)
+
+async def cached_xml(key: str, build, ttl: float) -> CachedResponse:
+    """cached() for builders that return the XML text"""
+    entry = response_cache.get(key)
+    if entry is None:
+        generation = response_cache.generation
+        xml = await build()
+        entry = response_cache.set(key, None, ttl, body=xml.encode(), generation=generation)
+    return entry
+
+def sitemap_file_size() -> int:
+    return max(SITEMAP_MAX_URLS - SITEMAP_PAGES, 1)
+
+async def latest_post_update() -> Optional[datetime]:
+    post = await db.blog_posts.find_one(blog_query(True), SITEMAP_FIELDS, sort=[("updated_at", DESCENDING)])
+    return post["updated_at"] if post else None
+
+async def build_sitemap(site: str, number: int):
+    """<urlset> with the number-th slice of published posts.
+
+    Each file is built and cached on its own, so crawlers walking a large
+    archive only pay for the files they actually fetch.
+    """
+    size = sitemap_file_size()
+    posts = await db.blog_posts.find(blog_query(True), SITEMAP_FIELDS) \
+        .sort(SITEMAP_SORT).skip((number - 1) * size).limit(size).to_list(size)
+    if number > 1 and not posts:
+        raise HTTPException(status_code=404, detail="Sitemap not found")
+    urls = []
+    if number == 1:
+        settings_entry, areas_entry, blog_updated = await asyncio.gather(
+            cached("settings", load_settings, SETTINGS_CACHE_TTL),
+            cached("areas", load_areas, CONTENT_CACHE_TTL),
+            latest_post_update(),
+        )
+        landing_updated = newest(settings_entry.value.updated_at, blog_updated,
+                                 *(a.created_at for a in areas_entry.value if a.is_active))
+        urls.append(sitemap_url(f"{site}/", landing_updated, alternates=True))
+        urls.append(sitemap_url(f"{site}/blog", blog_updated, alternates=True))
+    urls.extend(sitemap_url(f"{site}/blog/{p['slug']}", p.get("updated_at")) for p in posts if p.get("slug"))
+    return f"{XML_DECLARATION}<urlset {SITEMAP_NS} {XHTML_NS}>{''.join(urls)}</urlset>"
+
+async def build_sitemap_root(site: str):
+    """The only sitemap while everything fits in one file, else an index of sitemap-{n}.xml"""
+    total = await db.blog_posts.count_documents(blog_query(True))
+    if total + SITEMAP_PAGES <= SITEMAP_MAX_URLS:
+        return await build_sitemap(site, 1)
+    files = math.ceil(total / sitemap_file_size())
+    entries = "".join(
+        f"<sitemap><loc>{xml_escape(f'{site}/api/sitemap-{n}.xml')}</loc></sitemap>" for n in range(1, files + 1)
+    )
+    return f"{XML_DECLARATION}<sitemapindex {SITEMAP_NS}>{entries}</sitemapindex>"
+
+async def load_feed_posts() -> tuple:
+    """Latest published posts with their rendered bodies, and area titles by id"""
+    posts, areas_entry = await asyncio.gather(
+        db.blog_posts.find(blog_query(True), FEED_FIELDS).sort(PAGE_SORT).limit(FEED_ITEMS).to_list(FEED_ITEMS),
+        cached("areas", load_areas, CONTENT_CACHE_TTL),
+    )
+    return posts, {a.id: a.title for a in areas_entry.value}
+
+def feed_categories(post: dict, area_titles: Dict[str, str]) -> List[str]:
+    categories = [post.get("category"), area_titles.get(post.get("related_area_id"))] + post.get("tags", [])
+    return list(dict.fromkeys(c for c in categories if c))
+
+async def build_rss(site: str):
+    posts, area_titles = await load_feed_posts()
+    updated_at = newest(*(p["updated_at"] for p in posts))
+    items = []
+    for post in posts:
+        link = xml_escape(f"{site}/blog/{post['slug']}")
+        categories = "".join(f"<category>{xml_escape(c)}</category>" for c in feed_categories(post, area_titles))
+        items.append(
+            f"<item><title>{xml_escape(post['title'])}</title><link>{link}</link>"
+            f"<guid isPermaLink=\"false\">{xml_escape(post['id'])}</guid>"
+            f"<pubDate>{format_datetime(as_utc(post['created_at']), usegmt=True)}</pubDate>"
+            f"<dc:creator>{xml_escape(post.get('author_name', ''))}</dc:creator>{categories}"
+            f"<description>{xml_escape(post['excerpt'])}</description>"
+            f"<content:encoded>{xml_escape(post.get('content_html', ''))}</content:encoded></item>"
+        )
+    last_build = f"<lastBuildDate>{format_datetime(updated_at, usegmt=True)}</lastBuildDate>" if updated_at else ""
+    xml = (
+        f'{XML_DECLARATION}<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom" '
+        f'xmlns:content="http://purl.org/rss/1.0/modules/content/" xmlns:dc="http://purl.org/dc/elements/1.1/">'
+        f"<channel><title>{xml_escape(SITE_NAME)} - Blog</title><link>{xml_escape(f'{site}/blog')}</link>"
+        f"<description>{xml_escape(SITE_NAME)} - Blog</description><language>pt-BR</language>{last_build}"
+        f'<atom:link href={quoteattr(f"{site}/api/feed.xml")} rel="self" type="application/rss+xml"/>'
+        f"{''.join(items)}</channel></rss>"
+    )
+    return xml
+
+async def build_atom(site: str):
+    posts, area_titles = await load_feed_posts()
+    updated_at = newest(*(p["updated_at"] for p in posts))
+    entries = []
+    for post in posts:
+        link = quoteattr(f"{site}/blog/{post['slug']}")
+        categories = "".join(f"<category term={quoteattr(c)}/>" for c in feed_categories(post, area_titles))
+        entries.append(
+            f"<entry><id>urn:uuid:{xml_escape(post['id'])}</id><title>{xml_escape(post['title'])}</title>"
+            f'<link rel="alternate" type="text/html" href={link}/>'
+            f"<published>{w3c_datetime(post['created_at'])}</published>"
+            f"<updated>{w3c_datetime(post['updated_at'])}</updated>"
+            f"<author><name>{xml_escape(post.get('author_name', ''))}</name></author>{categories}"
+            f"<summary>{xml_escape(post['excerpt'])}</summary>"
+            f'<content type="html">{xml_escape(post.get("content_html", ""))}</content></entry>'
+        )
+    feed_updated = w3c_datetime(updated_at or datetime.now(timezone.utc))
+    xml = (
+        f'{XML_DECLARATION}<feed xmlns="http://www.w3.org/2005/Atom" xml:lang="pt-BR">'
+        f"<id>{xml_escape(f'{site}/blog')}</id><title>{xml_escape(SITE_NAME)} - Blog</title>"
+        f"<updated>{feed_updated}</updated>"
+        f'<link rel="alternate" type="text/html" href={quoteattr(f"{site}/blog")}/>'
+        f'<link rel="self" type="application/atom+xml" href={quoteattr(f"{site}/api/feed.atom")}/>'
+        f"{''.join(entries)}</feed>"
+    )
+    return xml
+
+@api_router.get("/sitemap.xml")
+async def get_sitemap(request: Request):
+    site = site_url()
+    entry = await cached_xml("seo:sitemap", lambda: build_sitemap_root(site), SEO_CACHE_TTL)
+    return json_response(entry, request, "seo", media_type="application/xml")
+
+@api_router.get("/sitemap-{number}.xml")
+async def get_sitemap_file(number: int, request: Request):
+    if number < 1:
+        raise HTTPException(status_code=404, detail="Sitemap not found")
+    site = site_url()
+    entry = await cached_xml(f"seo:sitemap:{number}", lambda: build_sitemap(site, number), SEO_CACHE_TTL)
+    return json_response(entry, request, "seo", media_type="application/xml")
+
+@api_router.get("/feed.xml")
+async def get_rss_feed(request: Request):
+    site = site_url()
+    entry = await cached_xml("seo:rss", lambda: build_rss(site), SEO_CACHE_TTL)
+    return json_response(entry, request, "seo", media_type="application/rss+xml")
+
+@api_router.get("/feed.atom")
+async def get_atom_feed(request: Request):
+    site = site_url()
+    entry = await cached_xml("seo:atom", lambda: build_atom(site), SEO_CACHE_TTL)
+    return json_response(entry, request, "seo", media_type="application/atom+xml")
+
 # ============ STATS ROUTES ============
 
-@api_router.get("/stats/dashboard")
-async def get_dashboard_stats(user: dict = Depends(get_current_user)):
-    total_messages = await db.contact_messages.count_documents({})
-    unread_messages = await db.contact_messages.count_documents({"is_read": False})
-    total_posts = await db.blog_posts.count_documents({})
-    total_areas = await db.areas.count_documents({})
-    
+def count_by(key) -> List[dict]:
+    return [{"$group": {"_id": key, "count": {"$sum": 1}}}]
+
+def count_by_period(fmt: str) -> List[dict]:
+    return count_by({"$dateToString": {"format": fmt, "date": "$created_at", "timezone": STATS_TIMEZONE}})
+
+def stats_series(labels: List[str], rows: List[dict]) -> List[StatsPoint]:
+    """One point per label, oldest first, with zeros for empty periods"""
+    counts = {row["_id"]: row["count"] for row in rows}
+    return [StatsPoint(label=label, count=counts.get(label, 0)) for label in labels]
+
+async def load_dashboard_stats() -> DashboardStats:
+    """Counts and time series for the admin dashboard, fetched concurrently.
+
+    Totals come from collection metadata and the filtered counts and series
+    each use an index, so the whole load costs one round trip of latency.
+    Leads by area cover the same recent window as the message series rather
+    than scanning every message ever received.
+    """
+    tz = ZoneInfo(STATS_TIMEZONE)
+    today = datetime.now(tz).date()
+    days = [today - timedelta(days=n) for n in reversed(range(STATS_DAYS))]
+    mondays = [today - timedelta(days=today.weekday(), weeks=n) for n in reversed(range(STATS_WEEKS))]
+    months = [divmod(today.year * 12 + today.month - 1 - n, 12) for n in reversed(range(STATS_MONTHS))]
+    start_of = lambda day: datetime.combine(day, datetime.min.time(), tz)
+    messages_since = start_of(min(days[0], mondays[0]))
+    posts_since = start_of(date(months[0][0], months[0][1] + 1, 1))
+
+    (total_messages, unread_messages, message_series,
+     total_posts, published_posts, posts_per_month, total_areas) = await asyncio.gather(
+        db.contact_messages.estimated_document_count(),
+        db.contact_messages.count_documents({"is_read": False}),
+        db.contact_messages.aggregate([
+            {"$match": {"created_at": {"$gte": messages_since}}},
+            {"$facet": {
+                "per_day": count_by_period("%Y-%m-%d"),
+                "per_week": count_by_period("%G-W%V"),
+                "by_area": count_by("$area_of_interest") + [{"$sort": {"count": -1}}],
+            }},
+        ]).to_list(1),
+        db.blog_posts.estimated_document_count(),
+        db.blog_posts.count_documents({"is_published": True}),
+        db.blog_posts.aggregate(
+            [{"$match": {"created_at": {"$gte": posts_since}}}] + count_by_period("%Y-%m")
+        ).to_list(None),
+        db.areas.estimated_document_count(),
+    )
+    message_series = message_series[0] if message_series else {"per_day": [], "per_week": [], "by_area": []}
+    return DashboardStats(
+        total_messages=total_messages,
+        unread_messages=unread_messages,
+        total_posts=total_posts,
+        published_posts=published_posts,
+        total_areas=total_areas,
+        messages_per_day=stats_series([day.isoformat() for day in days], message_series["per_day"]),
+        messages_per_week=stats_series(
+            [f"{year}-W{week:02d}" for year, week, _ in (monday.isocalendar() for monday in mondays)],
+            message_series["per_week"]
+        ),
+        posts_per_month=stats_series([f"{year}-{month + 1:02d}" for year, month in months], posts_per_month),
+        leads_by_area=[
+            StatsPoint(label=row["_id"] or "", count=row["count"]) for row in message_series["by_area"]
+        ],
+    )
+
+@api_router.get("/stats/dashboard", response_model=DashboardStats)
+async def get_dashboard_stats(request: Request, user: dict = Depends(get_current_user)):
+    return json_response(await cached("stats:dashboard", load_dashboard_stats, STATS_CACHE_TTL), request, "stats")
+
+@api_router.get("/stats/indexes")
+async def get_index_report(user: dict = Depends(get_current_user)):
+    """Missing, undeclared and never-used indexes per collection"""
+    return await index_manager.report()
+
+@api_router.get("/stats/runtime")
+async def get_runtime_stats(user: dict = Depends(get_current_user)):
+    """Queue depths and counters of this worker's background subsystems"""
     return {
-        "total_messages": total_messages,
-        "unread_messages": unread_messages,
-        "total_posts": total_posts,
-        "total_areas": total_areas
+        "password_hasher": password_hasher.metrics(),
+        "contact_queue": contact_queue.metrics(),
+        "email_outbox": email_worker.metrics(),
+        "rate_limiter": rate_limiter.metrics(),
     }
 
 # Include router
@@ -690,6 +3020,7 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "X-Next-Cursor", "X-Total-Count", "Retry-After"],
 )
 
 logging.basicConfig(
@@ -698,6 +3029,45 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def apply_schema_migrations():
+    try:
+        if RUN_MIGRATIONS_ON_STARTUP:
+            await schema_migrations.run()
+        else:
+            await schema_migrations.check()
+    except Exception:
+        # Keep serving; the read path still converts legacy documents
+        logger.exception("Schema migration failed")
+
+@app.on_event("startup")
+async def ensure_indexes():
+    if not ENSURE_INDEXES_ON_STARTUP:
+        return
+    try:
+        await index_manager.ensure()
+        for collection, drift in (await index_manager.report()).items():
+            if drift["missing"]:
+                logger.warning(f"Missing indexes on {collection}: {', '.join(drift['missing'])}")
+    except Exception:
+        logger.exception("Index provisioning failed")
+
+@app.on_event("startup")
+async def start_cache_coherence():
+    content_versions.start()
+
+@app.on_event("startup")
+async def start_contact_queue():
+    contact_queue.start()
+    email_worker.start()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    # Drain buffered leads before the client closes
+    await contact_queue.stop()
+    message_events.close()
+    await email_worker.stop()
+    await content_versions.stop()
+    password_hasher.shutdown()
+    image_pipeline.shutdown()
     client.close()
@@ -0,0 +1,204 @@
+"""
+Email outbox tests for Star Trade CMS
+Runs EmailOutboxWorker against an in-memory outbox and a patched smtplib.SMTP,
+so no mail server or MongoDB is needed
+"""
+import asyncio
+import os
+import smtplib
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+
+def matches(doc, query):
+    """The subset of Mongo query syntax the worker uses: equality, $lte and $or"""
+    for field, condition in query.items():
+        if field == "$or":
+            if not any(matches(doc, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            if field not in doc or not doc[field] <= condition["$lte"]:
+                return False
+        elif doc.get(field) != condition:
+            return False
+    return True
+
+
+class FakeOutbox:
+    """email_outbox stand-in with the unique idempotency_key index"""
+
+    def __init__(self):
+        self.rows = []
+
+    async def insert_many(self, docs, ordered=True):
+        errors = []
+        for doc in docs:
+            if any(row["idempotency_key"] == doc["idempotency_key"] for row in self.rows):
+                errors.append({"code": 11000})
+            else:
+                self.rows.append(dict(doc))
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+    async def find_one_and_update(self, query, update, projection=None, sort=None, return_document=None):
+        due = sorted((row for row in self.rows if matches(row, query)), key=lambda row: row["next_attempt_at"])
+        if not due:
+            return None
+        due[0].update(update["$set"])
+        return dict(due[0])
+
+    async def update_one(self, query, update):
+        for row in self.rows:
+            if matches(row, query):
+                row.update(update["$set"])
+                return
+
+
+class FakeDb:
+    def __init__(self):
+        self.email_outbox = FakeOutbox()
+
+
+class FakeSMTP:
+    """Records every message; raises while `failures` is positive"""
+    sent = []
+    failures = 0
+
+    def __init__(self, host, port, timeout=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def starttls(self):
+        pass
+
+    def login(self, username, password):
+        pass
+
+    def send_message(self, message):
+        if FakeSMTP.failures:
+            FakeSMTP.failures -= 1
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        FakeSMTP.sent.append(message)
+
+
+@pytest.fixture
+def outbox(monkeypatch):
+    fake_db = FakeDb()
+    monkeypatch.setattr(server, "db", fake_db)
+    monkeypatch.setattr(server, "SMTP_HOST", "smtp.example.com")
+    monkeypatch.setattr(smtplib, "SMTP", FakeSMTP)
+    FakeSMTP.sent = []
+    FakeSMTP.failures = 0
+    return fake_db.email_outbox
+
+
+def lead(message_id="lead-1"):
+    now = datetime.now(timezone.utc)
+    return {
+        "id": f"email-{message_id}",
+        "idempotency_key": f"new-lead:{message_id}",
+        "to": "comercial@startrade.com.br",
+        "reply_to": "client@example.com",
+        "subject": "Novo contato: TEST_User",
+        "body": "Hello",
+        "status": "pending",
+        "attempts": 0,
+        "next_attempt_at": now,
+        "created_at": now,
+    }
+
+
+def deliver_next(worker):
+    """One iteration of EmailOutboxWorker._run; False when nothing is due"""
+    async def step():
+        await worker._slots.acquire()
+        job = await worker._claim()
+        if job is None:
+            worker._slots.release()
+            return False
+        await worker._deliver(job)
+        return True
+    return asyncio.run(step())
+
+
+def make_due(row):
+    row["next_attempt_at"] = datetime.now(timezone.utc) - timedelta(seconds=1)
+
+
+class TestEmailOutbox:
+    """Test delivery, retry and give-up paths of the outbox worker"""
+
+    def test_one_send_per_idempotency_key(self, outbox):
+        """Test that re-enqueueing the same lead (a retried contact flush) mails it once"""
+        asyncio.run(server.insert_many_idempotent(outbox, [lead()]))
+        asyncio.run(server.insert_many_idempotent(outbox, [lead()]))
+        worker = server.EmailOutboxWorker(1, 0)
+
+        while deliver_next(worker):
+            pass
+
+        assert len(outbox.rows) == 1
+        assert outbox.rows[0]["status"] == "sent"
+        assert len(FakeSMTP.sent) == 1
+        assert FakeSMTP.sent[0]["To"] == "comercial@startrade.com.br"
+        assert FakeSMTP.sent[0]["Reply-To"] == "client@example.com"
+        assert worker.sent == 1
+        print("✓ One email per idempotency key")
+
+    def test_failed_send_is_retried_with_backoff(self, outbox):
+        """Test that a failed send goes back to pending with next_attempt_at pushed out"""
+        FakeSMTP.failures = 1
+        asyncio.run(server.insert_many_idempotent(outbox, [lead()]))
+        worker = server.EmailOutboxWorker(1, 0)
+
+        before = datetime.now(timezone.utc)
+        assert deliver_next(worker)
+        row = outbox.rows[0]
+        assert row["status"] == "pending"
+        assert row["attempts"] == 1
+        assert "unexpectedly closed" in row["last_error"]
+        assert row["next_attempt_at"] >= before + timedelta(seconds=10)
+        assert worker.retried == 1
+
+        # Not due yet, so the next poll leaves it alone
+        assert not deliver_next(worker)
+
+        make_due(row)
+        assert deliver_next(worker)
+        assert row["status"] == "sent"
+        assert len(FakeSMTP.sent) == 1
+        print(f"✓ Retried after backoff, attempts: {row['attempts']}")
+
+    def test_gives_up_after_max_attempts(self, outbox, monkeypatch):
+        """Test that a row is marked failed once EMAIL_MAX_ATTEMPTS sends have failed"""
+        monkeypatch.setattr(server, "EMAIL_MAX_ATTEMPTS", 3)
+        FakeSMTP.failures = 100
+        asyncio.run(server.insert_many_idempotent(outbox, [lead()]))
+        worker = server.EmailOutboxWorker(1, 0)
+
+        row = outbox.rows[0]
+        for _ in range(3):
+            assert deliver_next(worker)
+            make_due(row)
+
+        assert row["status"] == "failed"
+        assert row["attempts"] == 3
+        assert not deliver_next(worker)
+        assert FakeSMTP.sent == []
+        assert (worker.retried, worker.failed) == (2, 1)
+        print("✓ Email marked failed after max attempts")
@@ -5,6 +5,8 @@ Tests multilingual functionality, settings API, and authentication
 import pytest
 import requests
 import os
+import time
+import uuid
 
 BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
 
@@ -13,6 +15,32 @@ ADMIN_EMAIL = "admin@startrade.com"
 ADMIN_PASSWORD = "StarTrade2024!"
 
 
+@pytest.fixture(scope="session")
+def admin_login():
+    """Log the admin in once per run; login:email allows only 5 attempts per 5 minutes"""
+    response = requests.post(f"{BASE_URL}/api/auth/login", json={
+        "email": ADMIN_EMAIL,
+        "password": ADMIN_PASSWORD
+    })
+    
+    # If user doesn't exist, register first
+    if response.status_code == 401:
+        response = requests.post(f"{BASE_URL}/api/auth/register", json={
+            "email": ADMIN_EMAIL,
+            "password": ADMIN_PASSWORD,
+            "name": "Admin"
+        })
+    return response
+
+
+@pytest.fixture(scope="session")
+def admin_headers(admin_login):
+    """Authorization headers for the shared admin session"""
+    if admin_login.status_code != 200:
+        pytest.skip("Could not authenticate")
+    return {"Authorization": f"Bearer {admin_login.json()['access_token']}"}
+
+
 class TestHealthAndSettings:
     """Test basic API health and settings endpoint"""
     
@@ -90,6 +118,16 @@ class TestHealthAndSettings:
         
         print("✓ About section has all translatable fields")
     
+    def test_settings_single_language_projection(self):
+        """Test that /api/settings?lang=es resolves TranslatableText to strings"""
+        full = requests.get(f"{BASE_URL}/api/settings").json()
+        response = requests.get(f"{BASE_URL}/api/settings?lang=es")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["hero"]["title"] == (full["hero"]["title"]["es"] or full["hero"]["title"][full["default_language"]])
+        assert isinstance(data["about"]["paragraph1"], str)
+        print(f"✓ Settings ES hero title: {data['hero']['title'][:50]}")
+    
     def test_settings_has_hero_video_url(self):
         """Test that hero has video_url for fullscreen video"""
         response = requests.get(f"{BASE_URL}/api/settings")
@@ -104,61 +142,44 @@ class TestHealthAndSettings:
 class TestAuthentication:
     """Test authentication endpoints"""
     
-    def test_login_with_valid_credentials(self):
+    def test_login_with_valid_credentials(self, admin_login):
         """Test login with admin credentials"""
-        response = requests.post(f"{BASE_URL}/api/auth/login", json={
-            "email": ADMIN_EMAIL,
-            "password": ADMIN_PASSWORD
-        })
-        
-        # If user doesn't exist, register first
-        if response.status_code == 401:
-            # Try to register
-            reg_response = requests.post(f"{BASE_URL}/api/auth/register", json={
-                "email": ADMIN_EMAIL,
-                "password": ADMIN_PASSWORD,
-                "name": "Admin"
-            })
-            if reg_response.status_code in [200, 201]:
-                # Try login again
-                response = requests.post(f"{BASE_URL}/api/auth/login", json={
-                    "email": ADMIN_EMAIL,
-                    "password": ADMIN_PASSWORD
-                })
-        
+        response = admin_login
         assert response.status_code == 200, f"Login failed with status {response.status_code}: {response.text}"
         data = response.json()
         assert "access_token" in data, "Missing access_token in response"
         assert "user" in data, "Missing user in response"
         print(f"✓ Login successful for {ADMIN_EMAIL}")
-        return data["access_token"]
     
     def test_login_with_invalid_credentials(self):
         """Test login with wrong password"""
+        # A throwaway email keeps failed attempts off the admin's login:email bucket
         response = requests.post(f"{BASE_URL}/api/auth/login", json={
-            "email": ADMIN_EMAIL,
+            "email": f"invalid-{uuid.uuid4().hex[:8]}@example.com",
             "password": "wrongpassword"
         })
         assert response.status_code == 401, f"Expected 401, got {response.status_code}"
         print("✓ Invalid credentials correctly rejected")
     
-    def test_auth_me_with_valid_token(self):
+    def test_login_rate_limited_per_email(self):
+        """Test that repeated failed logins for one email get 429 with Retry-After"""
+        email = f"ratelimit-{uuid.uuid4().hex[:8]}@example.com"
+        for _ in range(10):
+            response = requests.post(f"{BASE_URL}/api/auth/login", json={
+                "email": email,
+                "password": "wrongpassword"
+            })
+            if response.status_code == 429:
+                break
+            assert response.status_code == 401, f"Expected 401, got {response.status_code}"
+        else:
+            pytest.fail("No 429 after 10 failed logins")
+        assert int(response.headers["Retry-After"]) > 0
+        print(f"✓ Login rate limited, Retry-After: {response.headers['Retry-After']}")
+    
+    def test_auth_me_with_valid_token(self, admin_headers):
         """Test /auth/me endpoint with valid token"""
-        # First login
-        login_response = requests.post(f"{BASE_URL}/api/auth/login", json={
-            "email": ADMIN_EMAIL,
-            "password": ADMIN_PASSWORD
-        })
-        
-        if login_response.status_code != 200:
-            pytest.skip("Could not login to test /auth/me")
-        
-        token = login_response.json()["access_token"]
-        
-        # Test /auth/me
-        response = requests.get(f"{BASE_URL}/api/auth/me", headers={
-            "Authorization": f"Bearer {token}"
-        })
+        response = requests.get(f"{BASE_URL}/api/auth/me", headers=admin_headers)
         assert response.status_code == 200, f"Expected 200, got {response.status_code}"
         data = response.json()
         assert data["email"] == ADMIN_EMAIL
@@ -210,6 +231,72 @@ class TestBlogAPI:
         assert isinstance(data, list)
         print(f"✓ GET /api/blog?published_only=true returns {len(data)} posts")
 
+    def test_blog_list_omits_content(self):
+        """Test that listings are summaries unless fields=full is requested"""
+        summaries = requests.get(f"{BASE_URL}/api/blog?limit=5").json()
+        assert all("content" not in post for post in summaries)
+        full = requests.get(f"{BASE_URL}/api/blog?limit=5&fields=full").json()
+        assert all("content" in post for post in full)
+        print("✓ Blog listings omit content by default")
+
+    def test_blog_post_has_rendered_content(self):
+        """Test that GET /api/blog/{slug} serves pre-rendered HTML and reading stats"""
+        posts = requests.get(f"{BASE_URL}/api/blog?published_only=true&limit=1").json()
+        if not posts:
+            pytest.skip("No published posts")
+        post = requests.get(f"{BASE_URL}/api/blog/{posts[0]['slug']}").json()
+        assert post["content_html"]
+        assert isinstance(post["toc"], list)
+        assert post["reading_time"] >= 1
+        print(f"✓ Post renders {post['word_count']} words, {post['reading_time']} min read")
+
+    def test_blog_pagination_cursor(self):
+        """Test that GET /api/blog pages with limit and X-Next-Cursor"""
+        response = requests.get(f"{BASE_URL}/api/blog?limit=1&include_total=true")
+        assert response.status_code == 200
+        first_page = response.json()
+        assert len(first_page) <= 1
+        assert "X-Total-Count" in response.headers
+        
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor:
+            next_page = requests.get(f"{BASE_URL}/api/blog", params={"limit": 1, "cursor": cursor}).json()
+            assert not next_page or next_page[0]["id"] != first_page[0]["id"]
+        print(f"✓ Blog total count: {response.headers['X-Total-Count']}")
+    
+    def test_blog_invalid_cursor(self):
+        """Test that a malformed cursor is rejected"""
+        response = requests.get(f"{BASE_URL}/api/blog?cursor=not-a-cursor")
+        assert response.status_code == 400
+
+    def test_blog_search(self):
+        """Test GET /api/blog/search returns a page of results with facets"""
+        response = requests.get(f"{BASE_URL}/api/blog/search", params={"q": "comércio", "limit": 2})
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["posts"]) <= 2
+        assert data["page"] == 1
+        assert data["total"] >= len(data["posts"])
+        assert all(post["is_published"] for post in data["posts"])
+        assert isinstance(data["tags"], list) and isinstance(data["categories"], list)
+        print(f"✓ Blog search matched {data['total']} posts")
+
+    def test_sitemap_and_feed(self):
+        """Test GET /api/sitemap.xml and /api/feed.xml serve cacheable XML"""
+        response = requests.get(f"{BASE_URL}/api/sitemap.xml")
+        if response.status_code == 404:
+            pytest.skip("SITE_URL is not configured")
+        assert response.status_code == 200
+        assert response.headers["Content-Type"].startswith("application/xml")
+        assert b'hreflang="en"' in response.content
+        revalidated = requests.get(f"{BASE_URL}/api/sitemap.xml", headers={"If-None-Match": response.headers["ETag"]})
+        assert revalidated.status_code == 304
+
+        feed = requests.get(f"{BASE_URL}/api/feed.xml")
+        assert feed.status_code == 200
+        assert feed.headers["Content-Type"].startswith("application/rss+xml")
+        print(f"✓ Sitemap {len(response.content)} bytes, feed {len(feed.content)} bytes")
+
 
 class TestContactAPI:
     """Test contact form endpoint"""
@@ -227,29 +314,220 @@ class TestContactAPI:
         data = response.json()
         assert "id" in data, "Missing id in response"
         print(f"✓ Contact form submission successful, id: {data['id']}")
+    
+    def test_queued_contact_is_stored(self, admin_headers):
+        """Test that a queued submission reaches /api/messages after the batch flush"""
+        headers = admin_headers
+        
+        response = requests.post(f"{BASE_URL}/api/contact", json={
+            "name": "TEST_Queued",
+            "email": f"queued-{uuid.uuid4().hex[:8]}@example.com",
+            "message": "Queued contact round trip"
+        })
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+        message_id = response.json()["id"]
+        
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            messages = requests.get(f"{BASE_URL}/api/messages", headers=headers).json()
+            if any(m["id"] == message_id for m in messages):
+                break
+            time.sleep(0.25)
+        else:
+            pytest.fail(f"Message {message_id} was not stored")
+        requests.delete(f"{BASE_URL}/api/messages/{message_id}", headers=headers)
+        print(f"✓ Queued contact {message_id} stored")
+    
+    def test_export_messages_requires_auth(self):
+        """Test that GET /api/messages/export requires authentication"""
+        response = requests.get(f"{BASE_URL}/api/messages/export?format=csv")
+        assert response.status_code in [401, 403], f"Expected auth error, got {response.status_code}"
+        print("✓ Message export requires authentication")
+
+    def test_stream_requires_stream_token(self, admin_headers):
+        """Test that the event stream refuses session JWTs and API routes refuse stream tokens"""
+        session_token = admin_headers["Authorization"].split(" ", 1)[1]
+        response = requests.get(f"{BASE_URL}/api/messages/stream", params={"token": session_token})
+        assert response.status_code == 401, f"Expected 401, got {response.status_code}"
+
+        issued = requests.post(f"{BASE_URL}/api/messages/stream-token", headers=admin_headers)
+        assert issued.status_code == 200, f"Expected 200, got {issued.status_code}: {issued.text}"
+        stream_token = issued.json()["token"]
+
+        me = requests.get(f"{BASE_URL}/api/auth/me", headers={"Authorization": f"Bearer {stream_token}"})
+        assert me.status_code == 401, f"Expected 401, got {me.status_code}"
+
+        with requests.get(f"{BASE_URL}/api/messages/stream", params={"token": stream_token}, stream=True, timeout=10) as response:
+            assert response.status_code == 200
+            assert response.headers["Content-Type"].startswith("text/event-stream")
+        print("✓ Event stream only accepts stream tokens")
+
+
+class TestLandingAPI:
+    """Test aggregated landing bootstrap endpoint"""
+    
+    def test_get_landing(self):
+        """Test GET /api/landing returns settings, areas and blog posts"""
+        response = requests.get(f"{BASE_URL}/api/landing")
+        assert response.status_code == 200
+        data = response.json()
+        for key in ["settings", "areas", "blog_posts"]:
+            assert key in data, f"Missing '{key}' in landing payload"
+        assert isinstance(data["settings"]["hero"]["title"], dict)
+        assert all(area.get("is_active", True) for area in data["areas"])
+        assert len(data["blog_posts"]) <= 3
+        print(f"✓ Landing returns {len(data['areas'])} areas, {len(data['blog_posts'])} posts")
+    
+    def test_get_landing_single_language(self):
+        """Test GET /api/landing?lang=en resolves translatable fields"""
+        response = requests.get(f"{BASE_URL}/api/landing?lang=en")
+        assert response.status_code == 200
+        data = response.json()
+        assert isinstance(data["settings"]["hero"]["title"], str)
+        for area in data["areas"]:
+            assert "title_en" not in area and "title_es" not in area
+        print(f"✓ Landing EN hero title: {data['settings']['hero']['title'][:50]}")
+    
+    def test_get_landing_rejects_unknown_language(self):
+        """Test that unsupported languages are rejected"""
+        response = requests.get(f"{BASE_URL}/api/landing?lang=fr")
+        assert response.status_code == 400
+
+
+class TestConditionalRequests:
+    """Test ETag / Last-Modified revalidation on public read endpoints"""
+    
+    @pytest.mark.parametrize("path", ["/api/settings", "/api/areas", "/api/blog"])
+    def test_etag_revalidation_returns_304(self, path):
+        """Test that a matching If-None-Match returns 304 without a body"""
+        response = requests.get(f"{BASE_URL}{path}")
+        assert response.status_code == 200
+        etag = response.headers.get("ETag")
+        assert etag, f"Missing ETag on {path}"
+        assert "Cache-Control" in response.headers
+        
+        cached = requests.get(f"{BASE_URL}{path}", headers={"If-None-Match": etag})
+        assert cached.status_code == 304, f"Expected 304, got {cached.status_code}"
+        assert cached.content == b""
+        print(f"✓ {path} revalidates with 304")
+    
+    def test_settings_last_modified(self):
+        """Test that settings expose Last-Modified and honour If-Modified-Since"""
+        response = requests.get(f"{BASE_URL}/api/settings")
+        last_modified = response.headers.get("Last-Modified")
+        assert last_modified, "Missing Last-Modified on /api/settings"
+        
+        cached = requests.get(f"{BASE_URL}/api/settings", headers={"If-Modified-Since": last_modified})
+        assert cached.status_code == 304
+        print(f"✓ Settings Last-Modified: {last_modified}")
+
+
+class TestMediaLibrary:
+    """Test media uploads, shared blobs and file serving"""
+    
+    def upload(self, admin_headers, content, folder="general", name="test.txt"):
+        response = requests.post(
+            f"{BASE_URL}/api/media/upload",
+            params={"folder": folder},
+            files={"file": (name, content, "text/plain")},
+            headers=admin_headers
+        )
+        assert response.status_code == 200, f"Upload failed: {response.text}"
+        return response.json()["file"]
+    
+    def test_duplicate_uploads_share_blob(self, admin_headers):
+        """Test that identical uploads get their own entries but share the stored bytes"""
+        content = f"TEST_media {uuid.uuid4()}".encode()
+        first = self.upload(admin_headers, content, folder="docs")
+        second = self.upload(admin_headers, content, folder="other", name="copy.txt")
+        assert first["id"] != second["id"]
+        assert first["storage_key"] == second["storage_key"]
+        assert second["folder"] == "other"
+        
+        # Deleting one entry keeps the bytes for the other
+        assert requests.delete(f"{BASE_URL}/api/media/{first['id']}", headers=admin_headers).status_code == 200
+        assert requests.get(f"{BASE_URL}{second['url']}").content == content
+        
+        assert requests.delete(f"{BASE_URL}/api/media/{second['id']}", headers=admin_headers).status_code == 200
+        assert requests.get(f"{BASE_URL}{second['url']}").status_code == 404
+        print("✓ Duplicate uploads share one blob until the last entry is deleted")
+    
+    @pytest.fixture
+    def hundred_byte_file(self, admin_headers):
+        """A 100-byte upload, deleted afterwards"""
+        content = f"TEST_range {uuid.uuid4()}".encode().ljust(100, b".")
+        media = self.upload(admin_headers, content)
+        yield media, content
+        requests.delete(f"{BASE_URL}/api/media/{media['id']}", headers=admin_headers)
+    
+    @pytest.mark.parametrize("range_header,start,end", [
+        ("bytes=10-19", 10, 19),
+        ("bytes=-10", 90, 99),
+        ("bytes=90-", 90, 99),
+        ("bytes=95-500", 95, 99),
+        ("bytes=-500", 0, 99),
+    ])
+    def test_range_returns_206(self, hundred_byte_file, range_header, start, end):
+        """Test single byte ranges, including suffix and open-ended ones"""
+        media, content = hundred_byte_file
+        response = requests.get(f"{BASE_URL}{media['url']}", headers={"Range": range_header})
+        assert response.status_code == 206, f"Expected 206, got {response.status_code}"
+        assert response.headers["Content-Range"] == f"bytes {start}-{end}/100"
+        assert response.headers["Content-Length"] == str(end - start + 1)
+        assert response.content == content[start:end + 1]
+        print(f"✓ {range_header} -> {response.headers['Content-Range']}")
+    
+    def test_range_beyond_end_returns_416(self, hundred_byte_file):
+        """Test that a range starting past the end is not satisfiable"""
+        media, _ = hundred_byte_file
+        response = requests.get(f"{BASE_URL}{media['url']}", headers={"Range": "bytes=100-"})
+        assert response.status_code == 416
+        assert response.headers["Content-Range"] == "bytes */100"
+    
+    def test_invalid_range_is_ignored(self, hundred_byte_file):
+        """Test that a range whose end precedes its start is ignored (RFC 9110 14.2)"""
+        media, content = hundred_byte_file
+        response = requests.get(f"{BASE_URL}{media['url']}", headers={"Range": "bytes=5-2"})
+        assert response.status_code == 200
+        assert response.content == content
+    
+    def test_multi_range_returns_full_file(self, hundred_byte_file):
+        """Test that multi-range requests fall back to the whole file"""
+        media, content = hundred_byte_file
+        response = requests.get(f"{BASE_URL}{media['url']}", headers={"Range": "bytes=0-1,5-6"})
+        assert response.status_code == 200
+        assert response.content == content
+    
+    def test_if_range_and_etag(self, hundred_byte_file):
+        """Test If-Range and If-None-Match against the content-hashed ETag"""
+        media, content = hundred_byte_file
+        response = requests.get(f"{BASE_URL}{media['url']}")
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        assert etag == f'"{media["checksum"]}"'
+        assert response.headers["Accept-Ranges"] == "bytes"
+        assert "immutable" in response.headers["Cache-Control"]
+        
+        matching = requests.get(f"{BASE_URL}{media['url']}", headers={"Range": "bytes=0-9", "If-Range": etag})
+        assert matching.status_code == 206
+        stale = requests.get(f"{BASE_URL}{media['url']}", headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+        assert stale.status_code == 200
+        assert stale.content == content
+        
+        cached = requests.get(f"{BASE_URL}{media['url']}", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        print(f"✓ Media ETag {etag} honours If-Range and If-None-Match")
 
 
 class TestSettingsUpdate:
     """Test settings update with authentication"""
     
     @pytest.fixture
-    def auth_token(self):
+    def auth_token(self, admin_login):
         """Get authentication token"""
-        response = requests.post(f"{BASE_URL}/api/auth/login", json={
-            "email": ADMIN_EMAIL,
-            "password": ADMIN_PASSWORD
-        })
-        if response.status_code != 200:
-            # Try to register
-            reg_response = requests.post(f"{BASE_URL}/api/auth/register", json={
-                "email": ADMIN_EMAIL,
-                "password": ADMIN_PASSWORD,
-                "name": "Admin"
-            })
-            if reg_response.status_code in [200, 201]:
-                return reg_response.json()["access_token"]
+        if admin_login.status_code != 200:
             pytest.skip("Could not authenticate")
-        return response.json()["access_token"]
+        return admin_login.json()["access_token"]
     
     def test_update_settings_requires_auth(self):
         """Test that PUT /api/settings requires authentication"""
@@ -286,6 +564,23 @@ class TestSettingsUpdate:
         assert "es" in updated_settings["hero"]["title"]
         
         print("✓ Settings update preserves multilingual format")
+    
+    def test_settings_update_moves_landing_last_modified(self, auth_token):
+        """Test that aggregates take Last-Modified from the last write to their collections"""
+        settings = requests.get(f"{BASE_URL}/api/settings").json()
+        put_response = requests.put(
+            f"{BASE_URL}/api/settings",
+            json=settings,
+            headers={"Authorization": f"Bearer {auth_token}"}
+        )
+        assert put_response.status_code == 200
+        
+        response = requests.get(f"{BASE_URL}/api/landing")
+        last_modified = response.headers.get("Last-Modified")
+        assert last_modified, "Missing Last-Modified on /api/landing"
+        cached = requests.get(f"{BASE_URL}/api/landing", headers={"If-Modified-Since": last_modified})
+        assert cached.status_code == 304
+        print(f"✓ Landing Last-Modified: {last_modified}")
 
 
 if __name__ == "__main__":
@@ -46,6 +46,7 @@ import {
 } from "lucide-react";
 
 const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
+const LIBRARY_PAGE_SIZE = 60;
 
 // Google Drive Icon Component
 const GoogleDriveIcon = () => (
@@ -74,6 +75,7 @@ export default function MediaUploader({
   const [uploadProgress, setUploadProgress] = useState(0);
   const [library, setLibrary] = useState([]);
   const [loadingLibrary, setLoadingLibrary] = useState(false);
+  const [libraryCursor, setLibraryCursor] = useState(null);
   const [searchTerm, setSearchTerm] = useState("");
   const [viewMode, setViewMode] = useState("grid");
   const [selectedItems, setSelectedItems] = useState([]);
@@ -106,16 +108,33 @@ export default function MediaUploader({
       const token = localStorage.getItem("token");
       const response = await axios.get(`${API}/media`, {
         headers: { Authorization: `Bearer ${token}` },
+        params: { limit: LIBRARY_PAGE_SIZE },
       });
       setLibrary(response.data || []);
+      setLibraryCursor(response.headers["x-next-cursor"] || null);
     } catch (error) {
       console.error("Error fetching library:", error);
       setLibrary([]);
+      setLibraryCursor(null);
     } finally {
       setLoadingLibrary(false);
     }
   };
 
+  const fetchMoreLibrary = async () => {
+    try {
+      const token = localStorage.getItem("token");
+      const response = await axios.get(`${API}/media`, {
+        headers: { Authorization: `Bearer ${token}` },
+        params: { limit: LIBRARY_PAGE_SIZE, cursor: libraryCursor },
+      });
+      setLibrary((prev) => [...prev, ...(response.data || [])]);
+      setLibraryCursor(response.headers["x-next-cursor"] || null);
+    } catch (error) {
+      console.error("Error fetching library:", error);
+    }
+  };
+
   const handleDragOver = useCallback((e) => {
     e.preventDefault();
     setIsDragging(true);
@@ -736,6 +755,13 @@ export default function MediaUploader({
                   ))}
                 </div>
               )}
+              {!loadingLibrary && libraryCursor && (
+                <div className="flex justify-center py-4">
+                  <Button variant="outline" size="sm" onClick={fetchMoreLibrary}>
+                    Carregar mais
+                  </Button>
+                </div>
+              )}
             </div>
 
             {/* Selection Actions */}
@@ -0,0 +1,62 @@
+import { useEffect, useRef } from "react";
+import axios from "axios";
+
+const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
+const RECONNECT_DELAY = 3000;
+
+// Subscribes to the admin message stream: onMessage receives each new lead,
+// onUnread the current unread count. The stream URL carries a short-lived
+// token, so every (re)connect fetches a fresh one instead of relying on
+// EventSource's own retry with a stale URL.
+export function useMessageEvents({ onMessage, onUnread }) {
+  const handlers = useRef({ onMessage, onUnread });
+  handlers.current = { onMessage, onUnread };
+
+  useEffect(() => {
+    const token = localStorage.getItem("token");
+    if (!token) return undefined;
+
+    let source = null;
+    let retry = null;
+    let closed = false;
+
+    const connect = async () => {
+      let streamToken;
+      try {
+        const response = await axios.post(`${API}/messages/stream-token`, null, {
+          headers: { Authorization: `Bearer ${token}` },
+        });
+        streamToken = response.data.token;
+      } catch (error) {
+        // A rejected session won't recover by retrying
+        if (!closed && error.response?.status !== 401) {
+          retry = setTimeout(connect, RECONNECT_DELAY);
+        }
+        return;
+      }
+      if (closed) return;
+
+      source = new EventSource(
+        `${API}/messages/stream?token=${encodeURIComponent(streamToken)}`
+      );
+      source.addEventListener("message", (event) => {
+        handlers.current.onMessage?.(JSON.parse(event.data));
+      });
+      source.addEventListener("unread", (event) => {
+        handlers.current.onUnread?.(JSON.parse(event.data).unread);
+      });
+      source.onerror = () => {
+        source.close();
+        if (!closed) retry = setTimeout(connect, RECONNECT_DELAY);
+      };
+    };
+
+    connect();
+
+    return () => {
+      closed = true;
+      clearTimeout(retry);
+      source?.close();
+    };
+  }, []);
+}
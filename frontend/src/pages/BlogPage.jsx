@@ -6,20 +6,35 @@ import { ArrowLeft, Calendar, ChevronRight, Search } from "lucide-react";
 import { Input } from "@/components/ui/input";
 
 const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
+const PAGE_SIZE = 12;
 
 export default function BlogPage() {
   const [posts, setPosts] = useState([]);
+  const [total, setTotal] = useState(0);
+  const [page, setPage] = useState(1);
+  const [categories, setCategories] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [searchTerm, setSearchTerm] = useState("");
+  const [category, setCategory] = useState("");
 
   useEffect(() => {
-    fetchPosts();
-  }, []);
+    // Debounced so typing doesn't fire a search per keystroke
+    const timer = setTimeout(() => fetchPosts(1), searchTerm ? 300 : 0);
+    return () => clearTimeout(timer);
+  }, [searchTerm, category]);
 
-  const fetchPosts = async () => {
+  const fetchPosts = async (nextPage) => {
     try {
-      const response = await axios.get(`${API}/blog?published_only=true`);
-      setPosts(response.data);
+      const response = await axios.get(`${API}/blog/search`, {
+        params: { q: searchTerm, category, page: nextPage, limit: PAGE_SIZE },
+      });
+      setPosts((prev) =>
+        nextPage > 1 ? [...prev, ...response.data.posts] : response.data.posts
+      );
+      setTotal(response.data.total);
+      setPage(nextPage);
+      setCategories(response.data.categories);
     } catch (error) {
       console.error("Error fetching posts:", error);
     } finally {
@@ -27,11 +42,11 @@ export default function BlogPage() {
     }
   };
 
-  const filteredPosts = posts.filter(
-    (post) =>
-      post.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      post.excerpt.toLowerCase().includes(searchTerm.toLowerCase())
-  );
+  const handleLoadMore = async () => {
+    setLoadingMore(true);
+    await fetchPosts(page + 1);
+    setLoadingMore(false);
+  };
 
   return (
     <div className="min-h-screen bg-slate-50">
@@ -81,6 +96,24 @@ export default function BlogPage() {
               data-testid="blog-search"
             />
           </div>
+          {categories.length > 0 && (
+            <div className="flex flex-wrap gap-2 mt-4" data-testid="blog-categories">
+              {categories.map((facet) => (
+                <button
+                  key={facet.value}
+                  type="button"
+                  onClick={() => setCategory(category === facet.value ? "" : facet.value)}
+                  className={`px-3 py-1 rounded-sm text-sm transition-colors ${
+                    category === facet.value
+                      ? "bg-[#1E3A8A] text-white"
+                      : "bg-white text-slate-600 hover:bg-slate-100"
+                  }`}
+                >
+                  {facet.value} ({facet.count})
+                </button>
+              ))}
+            </div>
+          )}
         </div>
 
         {/* Posts Grid */}
@@ -88,9 +121,9 @@ export default function BlogPage() {
           <div className="text-center py-12">
             <div className="animate-pulse text-slate-500">Carregando...</div>
           </div>
-        ) : filteredPosts.length > 0 ? (
+        ) : posts.length > 0 ? (
           <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-8">
-            {filteredPosts.map((post, index) => (
+            {posts.map((post, index) => (
               <Link
                 key={post.id}
                 to={`/blog/${post.slug}`}
@@ -134,12 +167,26 @@ export default function BlogPage() {
         ) : (
           <div className="text-center py-12 bg-white rounded-sm shadow-sm">
             <p className="text-slate-500">
-              {searchTerm
+              {searchTerm || category
                 ? "Nenhum post encontrado para sua busca."
                 : "Nenhum post publicado ainda."}
             </p>
           </div>
         )}
+
+        {posts.length < total && (
+          <div className="flex justify-center mt-10">
+            <Button
+              variant="outline"
+              className="rounded-sm"
+              onClick={handleLoadMore}
+              disabled={loadingMore}
+              data-testid="blog-load-more"
+            >
+              {loadingMore ? "Carregando..." : "Carregar mais"}
+            </Button>
+          </div>
+        )}
       </div>
 
       {/* Footer */}
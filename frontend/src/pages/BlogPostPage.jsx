@@ -2,7 +2,7 @@ import { useState, useEffect } from "react";
 import { useParams, Link } from "react-router-dom";
 import axios from "axios";
 import { Button } from "@/components/ui/button";
-import { ArrowLeft, Calendar, Tag, User } from "lucide-react";
+import { ArrowLeft, Calendar, Clock, Tag, User } from "lucide-react";
 
 const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
 
@@ -97,6 +97,12 @@ export default function BlogPostPage() {
               {post.author_name}
             </span>
           )}
+          {post.reading_time > 0 && (
+            <span className="flex items-center gap-1">
+              <Clock className="w-4 h-4" />
+              {post.reading_time} min de leitura
+            </span>
+          )}
           {post.category && (
             <span className="px-2 py-1 bg-[#1E3A8A]/10 text-[#1E3A8A] rounded-sm">
               {post.category}
@@ -129,14 +135,41 @@ export default function BlogPostPage() {
           </div>
         )}
 
-        {/* Content */}
-        <div className="prose prose-lg max-w-none">
-          {post.content.split("\n").map((paragraph, index) => (
-            <p key={index} className="mb-4 text-slate-700 leading-relaxed">
-              {paragraph}
+        {/* Table of Contents */}
+        {post.toc?.length > 1 && (
+          <nav className="mb-8 p-6 bg-slate-50 rounded-sm" data-testid="blog-post-toc">
+            <p className="font-['Oswald'] text-sm font-semibold text-slate-900 uppercase tracking-wider mb-3">
+              Neste artigo
             </p>
-          ))}
-        </div>
+            <ul className="space-y-2">
+              {post.toc.map((entry) => (
+                <li key={entry.anchor} className={entry.level === 3 ? "pl-4" : ""}>
+                  <a href={`#${entry.anchor}`} className="text-[#1E3A8A] hover:underline">
+                    {entry.text}
+                  </a>
+                </li>
+              ))}
+            </ul>
+          </nav>
+        )}
+
+        {/* Content */}
+        {post.content_html ? (
+          // Rendered and sanitized by the backend when the post is saved
+          <div
+            className="max-w-none text-lg text-slate-700 leading-relaxed [&_p]:mb-4 [&_h2]:font-['Oswald'] [&_h2]:text-2xl [&_h2]:font-bold [&_h2]:text-slate-900 [&_h2]:uppercase [&_h2]:mt-10 [&_h2]:mb-4 [&_h3]:text-xl [&_h3]:font-semibold [&_h3]:text-slate-900 [&_h3]:mt-8 [&_h3]:mb-3 [&_ul]:list-disc [&_ol]:list-decimal [&_ul]:pl-6 [&_ol]:pl-6 [&_ul]:mb-4 [&_ol]:mb-4 [&_a]:text-[#1E3A8A] [&_a]:underline [&_blockquote]:border-l-4 [&_blockquote]:pl-4 [&_blockquote]:italic [&_pre]:bg-slate-100 [&_pre]:p-4 [&_pre]:overflow-x-auto [&_pre]:mb-4 [&_table]:w-full [&_table]:mb-4 [&_th]:text-left [&_th]:border-b [&_td]:border-b [&_th]:py-2 [&_td]:py-2 [&_img]:max-w-full"
+            data-testid="blog-post-content"
+            dangerouslySetInnerHTML={{ __html: post.content_html }}
+          />
+        ) : (
+          <div className="prose prose-lg max-w-none">
+            {post.content.split("\n").map((paragraph, index) => (
+              <p key={index} className="mb-4 text-slate-700 leading-relaxed">
+                {paragraph}
+              </p>
+            ))}
+          </div>
+        )}
 
         {/* CTA */}
         <div className="mt-12 p-8 bg-slate-50 rounded-sm text-center">
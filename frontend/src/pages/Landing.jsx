@@ -121,14 +121,10 @@ export default function Landing() {
 
   const fetchData = async () => {
     try {
-      const [settingsRes, areasRes, blogRes] = await Promise.all([
-        axios.get(`${API}/settings`),
-        axios.get(`${API}/areas`),
-        axios.get(`${API}/blog?published_only=true`),
-      ]);
-      setSettings(settingsRes.data);
-      setAreas(areasRes.data.filter((a) => a.is_active !== false));
-      setBlogPosts(blogRes.data.slice(0, 3));
+      const response = await axios.get(`${API}/landing`);
+      setSettings(response.data.settings);
+      setAreas(response.data.areas);
+      setBlogPosts(response.data.blog_posts);
     } catch (error) {
       console.error("Error fetching data:", error);
     }
@@ -1,5 +1,6 @@
 import { useState } from "react";
 import { Outlet, NavLink, useNavigate } from "react-router-dom";
+import axios from "axios";
 import { Button } from "@/components/ui/button";
 import {
   LayoutDashboard,
@@ -13,6 +14,8 @@ import {
   ChevronRight,
 } from "lucide-react";
 
+const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
+
 const navItems = [
   { to: "/admin", icon: LayoutDashboard, label: "Dashboard", exact: true },
   { to: "/admin/areas", icon: Map, label: "Áreas de Atuação" },
@@ -27,6 +30,12 @@ export default function AdminLayout() {
   const user = JSON.parse(localStorage.getItem("user") || "{}");
 
   const handleLogout = () => {
+    const token = localStorage.getItem("token");
+    if (token) {
+      axios
+        .post(`${API}/auth/logout`, {}, { headers: { Authorization: `Bearer ${token}` } })
+        .catch(() => {});
+    }
     localStorage.removeItem("token");
     localStorage.removeItem("user");
     navigate("/login");
@@ -57,11 +57,19 @@ export default function BlogAdmin() {
     }
   };
 
-  const handleOpenDialog = (post = null) => {
+  const handleOpenDialog = async (post = null) => {
     if (post) {
-      setEditingPost(post);
-      setFormData(post);
-      setTagsInput(post.tags?.join(", ") || "");
+      // The list only carries summaries; load the full post for editing
+      let fullPost;
+      try {
+        fullPost = (await axios.get(`${API}/blog/${post.id}`)).data;
+      } catch (error) {
+        toast.error("Erro ao carregar post");
+        return;
+      }
+      setEditingPost(fullPost);
+      setFormData(fullPost);
+      setTagsInput(fullPost.tags?.join(", ") || "");
     } else {
       setEditingPost(null);
       setFormData(defaultPost);
@@ -9,6 +9,7 @@ import {
   TrendingUp,
   ArrowUpRight,
 } from "lucide-react";
+import { useMessageEvents } from "@/hooks/use-message-events";
 
 const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
 
@@ -17,7 +18,11 @@ export default function Dashboard() {
     total_messages: 0,
     unread_messages: 0,
     total_posts: 0,
+    published_posts: 0,
     total_areas: 0,
+    messages_per_day: [],
+    messages_per_week: [],
+    leads_by_area: [],
   });
   const [recentMessages, setRecentMessages] = useState([]);
   const [loading, setLoading] = useState(true);
@@ -26,6 +31,16 @@ export default function Dashboard() {
     fetchData();
   }, []);
 
+  useMessageEvents({
+    onMessage: (message) => {
+      setRecentMessages((prev) =>
+        prev.some((m) => m.id === message.id) ? prev : [message, ...prev].slice(0, 5)
+      );
+      setStats((prev) => ({ ...prev, total_messages: prev.total_messages + 1 }));
+    },
+    onUnread: (unread) => setStats((prev) => ({ ...prev, unread_messages: unread })),
+  });
+
   const fetchData = async () => {
     try {
       const token = localStorage.getItem("token");
@@ -33,7 +48,7 @@ export default function Dashboard() {
 
       const [statsRes, messagesRes] = await Promise.all([
         axios.get(`${API}/stats/dashboard`, { headers }),
-        axios.get(`${API}/messages`, { headers }),
+        axios.get(`${API}/messages`, { headers, params: { limit: 5 } }),
       ]);
 
       setStats(statsRes.data);
@@ -58,7 +73,7 @@ export default function Dashboard() {
       value: stats.total_posts,
       icon: FileText,
       color: "bg-green-500",
-      subtext: "Total publicado",
+      subtext: `${stats.published_posts} publicados`,
     },
     {
       title: "Áreas de Atuação",
@@ -69,6 +84,8 @@ export default function Dashboard() {
     },
   ];
 
+  const maxPerDay = Math.max(1, ...stats.messages_per_day.map((p) => p.count));
+
   if (loading) {
     return (
       <div className="flex items-center justify-center h-64">
@@ -115,6 +132,55 @@ export default function Dashboard() {
         ))}
       </div>
 
+      {/* Activity */}
+      <div className="grid grid-cols-1 lg:grid-cols-3 gap-6">
+        <Card className="border-0 shadow-sm lg:col-span-2" data-testid="messages-per-day">
+          <CardHeader className="border-b border-slate-100">
+            <CardTitle className="font-['Oswald'] text-lg font-semibold uppercase tracking-wide flex items-center gap-2">
+              <TrendingUp className="w-5 h-5 text-[#1E3A8A]" />
+              Mensagens por Dia
+            </CardTitle>
+          </CardHeader>
+          <CardContent className="p-6">
+            <div className="flex items-end gap-1 h-32">
+              {stats.messages_per_day.map((point) => (
+                <div
+                  key={point.label}
+                  className="flex-1 bg-[#1E3A8A] rounded-t-sm min-h-[2px]"
+                  style={{ height: `${(point.count / maxPerDay) * 100}%` }}
+                  title={`${new Date(`${point.label}T12:00:00`).toLocaleDateString("pt-BR")}: ${point.count}`}
+                />
+              ))}
+            </div>
+          </CardContent>
+        </Card>
+
+        <Card className="border-0 shadow-sm" data-testid="leads-by-area">
+          <CardHeader className="border-b border-slate-100">
+            <CardTitle className="font-['Oswald'] text-lg font-semibold uppercase tracking-wide">
+              Leads por Área
+            </CardTitle>
+            <p className="text-xs text-slate-400">
+              Últimas {stats.messages_per_week.length} semanas
+            </p>
+          </CardHeader>
+          <CardContent className="p-6 space-y-3">
+            {stats.leads_by_area.length > 0 ? (
+              stats.leads_by_area.map((point) => (
+                <div key={point.label} className="flex items-center justify-between text-sm">
+                  <span className="text-slate-600 truncate">
+                    {point.label || "Não informada"}
+                  </span>
+                  <span className="font-semibold text-slate-900">{point.count}</span>
+                </div>
+              ))
+            ) : (
+              <p className="text-sm text-slate-500">Nenhum lead ainda.</p>
+            )}
+          </CardContent>
+        </Card>
+      </div>
+
       {/* Recent Messages */}
       <Card className="border-0 shadow-sm" data-testid="recent-messages">
         <CardHeader className="border-b border-slate-100">
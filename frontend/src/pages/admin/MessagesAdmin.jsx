@@ -19,25 +19,40 @@ import {
   Calendar,
   X,
 } from "lucide-react";
+import { useMessageEvents } from "@/hooks/use-message-events";
 
 const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
+const PAGE_SIZE = 50;
 
 export default function MessagesAdmin() {
   const [messages, setMessages] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
   const [selectedMessage, setSelectedMessage] = useState(null);
+  const [unreadTotal, setUnreadTotal] = useState(null);
 
   useEffect(() => {
     fetchMessages();
   }, []);
 
-  const fetchMessages = async () => {
+  useMessageEvents({
+    onMessage: (message) =>
+      setMessages((prev) =>
+        prev.some((m) => m.id === message.id) ? prev : [message, ...prev]
+      ),
+    onUnread: setUnreadTotal,
+  });
+
+  const fetchMessages = async (cursor = null) => {
     try {
       const token = localStorage.getItem("token");
       const response = await axios.get(`${API}/messages`, {
         headers: { Authorization: `Bearer ${token}` },
+        params: { limit: PAGE_SIZE, ...(cursor && { cursor }) },
       });
-      setMessages(response.data);
+      setMessages((prev) => (cursor ? [...prev, ...response.data] : response.data));
+      setNextCursor(response.headers["x-next-cursor"] || null);
     } catch (error) {
       toast.error("Erro ao carregar mensagens");
     } finally {
@@ -45,6 +60,12 @@ export default function MessagesAdmin() {
     }
   };
 
+  const handleLoadMore = async () => {
+    setLoadingMore(true);
+    await fetchMessages(nextCursor);
+    setLoadingMore(false);
+  };
+
   const handleMarkAsRead = async (id) => {
     try {
       const token = localStorage.getItem("token");
@@ -53,7 +74,9 @@ export default function MessagesAdmin() {
         {},
         { headers: { Authorization: `Bearer ${token}` } }
       );
-      fetchMessages();
+      setMessages((prev) =>
+        prev.map((m) => (m.id === id ? { ...m, is_read: true } : m))
+      );
     } catch (error) {
       toast.error("Erro ao marcar como lida");
     }
@@ -69,7 +92,7 @@ export default function MessagesAdmin() {
       });
       toast.success("Mensagem excluída!");
       setSelectedMessage(null);
-      fetchMessages();
+      setMessages((prev) => prev.filter((m) => m.id !== id));
     } catch (error) {
       toast.error("Erro ao excluir mensagem");
     }
@@ -82,7 +105,8 @@ export default function MessagesAdmin() {
     }
   };
 
-  const unreadCount = messages.filter((m) => !m.is_read).length;
+  // The stream reports the count across all pages, not just the loaded ones
+  const unreadCount = unreadTotal ?? messages.filter((m) => !m.is_read).length;
 
   if (loading) {
     return (
@@ -162,6 +186,20 @@ export default function MessagesAdmin() {
         ))}
       </div>
 
+      {nextCursor && (
+        <div className="flex justify-center">
+          <Button
+            variant="outline"
+            className="rounded-sm"
+            onClick={handleLoadMore}
+            disabled={loadingMore}
+            data-testid="load-more-messages-btn"
+          >
+            {loadingMore ? "Carregando..." : "Carregar mais"}
+          </Button>
+        </div>
+      )}
+
       {messages.length === 0 && (
         <div className="text-center py-12 bg-white rounded-sm shadow-sm">
           <Mail className="w-12 h-12 mx-auto text-slate-300 mb-4" />
@@ -5,9 +5,11 @@ let currentLang = 'pt';
 // Load configuration
 async function loadConfig() {
     try {
-        const response = await fetch('config.json');
+        // Pre-rendered language pages (e.g. en/index.html) live one level down
+        const root = document.documentElement.dataset.siteRoot || '';
+        const response = await fetch(`${root}config.json`);
         config = await response.json();
-        currentLang = localStorage.getItem('lang') || config.site?.language || 'pt';
+        currentLang = document.documentElement.dataset.lang || localStorage.getItem('lang') || config.site?.language || 'pt';
         initSite();
     } catch (error) {
         console.error('Error loading config:', error);